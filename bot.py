@@ -6,7 +6,11 @@ import logging
 import asyncio
 from datetime import datetime
 
+# Before importing utils: their settings are read from the environment
 load_dotenv()
+
+from utils.services import attach_services, close_services
+
 TOKEN = os.getenv('TOKEN')
 
 # Set up logging
@@ -31,15 +35,19 @@ intents.members = True  # For member management features
 bot = commands.Bot(command_prefix='!', intents=intents)
 bot.start_time = datetime.utcnow()
 
-# Start web server in a separate thread
-def start_web_server():
+# Data store, indexes, activity log, timeouts, mod log and metrics (utils/services.py)
+attach_services(bot)
+
+# Start the web dashboard on the bot's own event loop
+async def start_web_server():
     try:
         from web_server import start_web_server
-        start_web_server(bot, host='0.0.0.0', port=5000)
+        bot.web_runner = await start_web_server(bot, host='0.0.0.0', port=5000)
     except ImportError:
         logger.warning("Web server module not found. Web interface will not be available.")
     except Exception as e:
         logger.error(f"Failed to start web server: {e}")
+
 # Async load_commands to properly await load_extension
 async def load_commands():
     loaded_count = 0
@@ -68,14 +76,18 @@ async def on_ready():
     
     # Only load commands once, after bot is ready
     if not hasattr(bot, "_commands_loaded"):
+        bot.loop_monitor.start()
+        bot.system_metrics.start()
+        bot.mod_log.start()
         loaded, failed = await load_commands()
         bot._commands_loaded = True
+        # After the cogs: timeouts that ran out while offline are dispatched
+        # straight away and need the moderation cog's listener to be logged
+        bot.timeouts.start()
         logger.info(f'Bot ready with {len(bot.tree.get_commands())} slash commands')
         
         # Start web server
-        import threading
-        web_thread = threading.Thread(target=start_web_server, daemon=True)
-        web_thread.start()
+        await start_web_server()
         logger.info("Web server started on http://localhost:5000")
 
 @bot.event
@@ -106,6 +118,8 @@ async def on_application_command_error(interaction, error):
 # Graceful shutdown
 async def shutdown():
     logger.info('Shutting down bot...')
+    if getattr(bot, 'web_runner', None):
+        await bot.web_runner.cleanup()
     await bot.close()
 
 # Health check command
@@ -122,9 +136,12 @@ async def health_check(ctx):
     embed.add_field(name="Status", value="✅ Online", inline=True)
     embed.add_field(name="Uptime", value=f"{uptime.days}d {uptime.seconds//3600}h {(uptime.seconds//60)%60}m", inline=True)
     embed.add_field(name="Latency", value=f"{round(bot.latency * 1000)}ms", inline=True)
+    lag = bot.loop_monitor.snapshot()
+    embed.add_field(name="Event Loop Lag", value=f"p50 {lag['p50']}ms / p99 {lag['p99']}ms / max {lag['max']}ms", inline=True)
     embed.add_field(name="Guilds", value=len(bot.guilds), inline=True)
     embed.add_field(name="Commands", value=len(bot.tree.get_commands()), inline=True)
     embed.add_field(name="Web Interface", value="http://localhost:5000", inline=True)
     await ctx.send(embed=embed)
 
 bot.run(TOKEN)
+close_services(bot)
@@ -1,13 +1,15 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import os
 from datetime import datetime, timedelta
 import asyncio
 from typing import Optional, List
 import logging
 
+from utils.bulk_actions import BulkAction, SkipTarget, parse_ids, run_bulk_action
+from utils.mod_log import moderation_embed
+
 logger = logging.getLogger(__name__)
 
 # Admin role IDs - configure these in your .env or here
@@ -159,25 +161,10 @@ class DataManagementView(discord.ui.View):
     @discord.ui.button(label="Vehicle Database", style=discord.ButtonStyle.primary, emoji="🚗")
     async def vehicle_database(self, interaction: discord.Interaction, button: discord.ui.Button):
         try:
-            from pathlib import Path
-            vehicles_file = Path("data/vehicles.json")
-            
-            if not vehicles_file.exists():
-                await interaction.response.send_message("❌ Vehicle database not found!", ephemeral=True)
-                return
-            
-            with open(vehicles_file, 'r') as f:
-                data = json.load(f)
-            
-            total_vehicles = len(data.get('vehicles', []))
-            
-            # Count by state
-            state_counts = {}
-            for vehicle in data.get('vehicles', []):
-                state = vehicle.get('state', 'Unknown')
-                state_counts[state] = state_counts.get(state, 0) + 1
-            
-            top_states = sorted(state_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+            stats = interaction.client.vehicle_stats
+            total_vehicles = stats.total
+            state_counts = stats.by_state
+            top_states = stats.top(state_counts)
             
             embed = discord.Embed(
                 title="🚗 Vehicle Database Statistics",
@@ -212,7 +199,9 @@ class DataManagementView(discord.ui.View):
             backup_path = backup_dir / f"backup_{timestamp}"
             
             if data_dir.exists():
-                shutil.copytree(data_dir, backup_path)
+                # Make sure queued writes are on disk, then copy off the event loop
+                await interaction.client.datastore.flush()
+                await asyncio.to_thread(shutil.copytree, data_dir, backup_path)
                 await interaction.followup.send(f"✅ Data backed up to `{backup_path}`", ephemeral=True)
             else:
                 await interaction.followup.send("❌ No data directory found to backup!", ephemeral=True)
@@ -244,8 +233,8 @@ class BotSettingsView(discord.ui.View):
         import psutil
         import platform
         
-        # System information
-        cpu_percent = psutil.cpu_percent(interval=1)
+        # System information (CPU comes from the background sampler)
+        cpu_percent = interaction.client.system_metrics.latest()['cpu']
         memory = psutil.virtual_memory()
         disk = psutil.disk_usage('/')
         
@@ -272,26 +261,17 @@ class VehicleManagementView(discord.ui.View):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            from pathlib import Path
-            vehicles_file = Path("data/vehicles.json")
-            
-            with open(vehicles_file, 'r') as f:
-                data = json.load(f)
-            
-            original_count = len(data.get('vehicles', []))
+            store = interaction.client.datastore
             
             # Remove test vehicles
-            data['vehicles'] = [
-                vehicle for vehicle in data.get('vehicles', [])
-                if not (vehicle.get('make', '').lower() == 'test' or 
-                       vehicle.get('model', '').lower() == 'test' or
-                       vehicle.get('plate', '').upper() == 'TEST')
+            test_keys = [
+                key for key, vehicle in store.items("vehicles")
+                if (vehicle.get('make', '').lower() == 'test' or 
+                    vehicle.get('model', '').lower() == 'test' or
+                    vehicle.get('plate', '').upper() == 'TEST')
             ]
             
-            removed_count = original_count - len(data['vehicles'])
-            
-            with open(vehicles_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            removed_count = store.delete_many("vehicles", test_keys)
             
             await interaction.followup.send(f"✅ Removed {removed_count} test vehicles from database!", ephemeral=True)
             
@@ -335,23 +315,29 @@ class MassRoleModal(discord.ui.Modal, title="Mass Role Assignment"):
                 await interaction.followup.send("❌ Role not found!", ephemeral=True)
                 return
             
-            user_id_list = [int(uid.strip()) for uid in self.user_ids.value.split(',')]
-            action = self.action.value.lower()
-            
-            success_count = 0
-            for user_id in user_id_list:
-                try:
-                    member = interaction.guild.get_member(user_id)
-                    if member:
-                        if action == 'add':
-                            await member.add_roles(role)
-                        elif action == 'remove':
-                            await member.remove_roles(role)
-                        success_count += 1
-                except:
-                    continue
+            action = self.action.value.lower().strip()
+            if action not in ('add', 'remove'):
+                await interaction.followup.send("❌ Action must be 'add' or 'remove'.", ephemeral=True)
+                return
             
-            await interaction.followup.send(f"✅ Successfully {action}ed role {role.name} for {success_count} members!", ephemeral=True)
+            user_id_list, invalid = parse_ids(self.user_ids.value)
+            reason = f"Mass role {action} by {interaction.user}"
+            
+            async def apply(user_id: int):
+                member = interaction.guild.get_member(user_id)
+                if member is None:
+                    raise LookupError("not a member of this server")
+                if action == 'add':
+                    if role in member.roles:
+                        raise SkipTarget("already has the role")
+                    await member.add_roles(role, reason=reason)
+                else:
+                    if role not in member.roles:
+                        raise SkipTarget("doesn't have the role")
+                    await member.remove_roles(role, reason=reason)
+            
+            label = f"{'Adding' if action == 'add' else 'Removing'} role {role.name}"
+            await run_bulk_action(interaction, BulkAction(label, apply), user_id_list, invalid)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {e}", ephemeral=True)
@@ -364,19 +350,22 @@ class BulkBanModal(discord.ui.Modal, title="Bulk Ban Users"):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            user_id_list = [int(uid.strip()) for uid in self.user_ids.value.split(',')]
+            user_id_list, invalid = parse_ids(self.user_ids.value)
             reason = self.reason.value
-            
-            success_count = 0
-            for user_id in user_id_list:
-                try:
-                    user = await interaction.client.fetch_user(user_id)
-                    await interaction.guild.ban(user, reason=reason)
-                    success_count += 1
-                except:
-                    continue
-            
-            await interaction.followup.send(f"✅ Successfully banned {success_count} users!", ephemeral=True)
+            client = interaction.client
+            
+            async def apply(user_id: int):
+                # Banning by ID works for users who aren't in the server or the
+                # cache, so there is no need to fetch each user first
+                await interaction.guild.ban(discord.Object(id=user_id), reason=reason)
+                user = client.get_user(user_id)
+                client.activity.record(
+                    "moderation.ban", f"Ban: {user or f'User#{user_id}'} by {interaction.user.display_name} (bulk)",
+                    actor_id=interaction.user.id, target_id=user_id, reason=reason
+                )
+                client.mod_log.send(moderation_embed("Ban", interaction.user, user or discord.Object(id=user_id), reason))
+            
+            await run_bulk_action(interaction, BulkAction("Banning users", apply), user_id_list, invalid)
             
         except Exception as e:
             await interaction.followup.send(f"❌ Error: {e}", ephemeral=True)
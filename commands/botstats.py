@@ -1,4 +1,5 @@
 import os
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -24,7 +25,8 @@ class BotStats(commands.Cog):
             return lines
 
         root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        total_lines = count_lines_of_code(root_dir)
+        # Walking the whole tree is slow; keep it off the event loop
+        total_lines = await asyncio.to_thread(count_lines_of_code, root_dir)
 
         # Memory usage
         process = psutil.Process(os.getpid())
@@ -41,6 +43,9 @@ class BotStats(commands.Cog):
         embed.add_field(name="Lines of Code", value=f"`{total_lines}` lines", inline=True)
         embed.add_field(name="Memory Usage", value=f"`{memory_used_mb}` MB", inline=True)
         embed.add_field(name="Uptime", value=f"`{uptime_hours}` hours", inline=True)
+        if hasattr(self.bot, 'loop_monitor'):
+            lag = self.bot.loop_monitor.snapshot()
+            embed.add_field(name="Event Loop Lag", value=f"`{lag['p99']}` ms p99", inline=True)
         embed.set_footer(text="Mellow's Greenville Roleplay™ - Developed by Baryonyx (Antivenom)")
         embed.timestamp = discord.utils.utcnow()
         await interaction.response.send_message(embed=embed)
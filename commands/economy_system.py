@@ -1,10 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import os
 from datetime import datetime, timedelta
-from pathlib import Path
 import logging
 import random
 from typing import Optional, Dict, Any
@@ -13,8 +11,6 @@ import asyncio
 logger = logging.getLogger(__name__)
 
 GUILD_ID = int(os.getenv("GUILD_ID", "1277047315047120978"))
-DATA_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / ".." / "data"
-ECONOMY_FILE = DATA_DIR / "economy.json"
 
 # Economy settings
 DAILY_REWARD = 1000
@@ -41,60 +37,37 @@ JOBS = [
 class EconomySystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        DATA_DIR.mkdir(exist_ok=True)
-        self.ensure_economy_file()
+        self.store = bot.datastore
     
-    def ensure_economy_file(self):
-        """Ensure economy data file exists"""
-        if not ECONOMY_FILE.exists():
-            with ECONOMY_FILE.open("w", encoding="utf-8") as f:
-                json.dump({"users": {}}, f, indent=2)
+    def default_user_data(self) -> Dict[str, Any]:
+        return {
+            "balance": 0,
+            "bank": 0,
+            "last_daily": None,
+            "last_weekly": None,
+            "last_work": None,
+            "total_earned": 0,
+            "total_spent": 0
+        }
     
     def get_user_data(self, user_id: str) -> Dict[str, Any]:
         """Get user's economy data"""
         try:
-            with ECONOMY_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            if user_id not in data["users"]:
-                data["users"][user_id] = {
-                    "balance": 0,
-                    "bank": 0,
-                    "last_daily": None,
-                    "last_weekly": None,
-                    "last_work": None,
-                    "total_earned": 0,
-                    "total_spent": 0
-                }
-                
-                with ECONOMY_FILE.open("w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2)
-            
-            return data["users"][user_id]
+            user_data = self.store.get("economy", user_id)
+            if user_data is None:
+                user_data = self.default_user_data()
+                self.store.put("economy", user_data, key=user_id)
+            
+            return user_data
             
         except Exception as e:
             logger.error(f"Error getting user data: {e}")
-            return {
-                "balance": 0,
-                "bank": 0,
-                "last_daily": None,
-                "last_weekly": None,
-                "last_work": None,
-                "total_earned": 0,
-                "total_spent": 0
-            }
+            return self.default_user_data()
     
     def update_user_data(self, user_id: str, user_data: Dict[str, Any]):
         """Update user's economy data"""
         try:
-            with ECONOMY_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            data["users"][user_id] = user_data
-            
-            with ECONOMY_FILE.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-                
+            self.store.put("economy", user_data, key=user_id)
         except Exception as e:
             logger.error(f"Error updating user data: {e}")
     
@@ -158,35 +131,36 @@ class EconomySystem(commands.Cog):
     @app_commands.command(name="daily", description="Claim your daily reward")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def daily(self, interaction: discord.Interaction):
-        user_data = self.get_user_data(str(interaction.user.id))
-        
-        now = datetime.utcnow()
-        
-        if user_data["last_daily"]:
-            last_daily = datetime.fromisoformat(user_data["last_daily"])
-            if now - last_daily < timedelta(days=1):
-                next_daily = last_daily + timedelta(days=1)
-                await interaction.response.send_message(
-                    f"❌ You've already claimed your daily reward! Next daily available {discord.utils.format_dt(next_daily, 'R')}",
-                    ephemeral=True
-                )
-                return
-        
-        # Calculate streak bonus
-        streak_bonus = 0
-        if user_data["last_daily"]:
-            last_daily = datetime.fromisoformat(user_data["last_daily"])
-            if now - last_daily <= timedelta(days=2):  # Allow 1 day grace period
-                streak_bonus = min(500, 50 * (user_data.get("daily_streak", 0)))
-        
-        total_reward = DAILY_REWARD + streak_bonus
-        
-        user_data["balance"] += total_reward
-        user_data["total_earned"] += total_reward
-        user_data["last_daily"] = now.isoformat()
-        user_data["daily_streak"] = user_data.get("daily_streak", 0) + 1
-        
-        self.update_user_data(str(interaction.user.id), user_data)
+        async with self.store.locked("economy", str(interaction.user.id)):
+            user_data = self.get_user_data(str(interaction.user.id))
+            
+            now = datetime.utcnow()
+            
+            if user_data["last_daily"]:
+                last_daily = datetime.fromisoformat(user_data["last_daily"])
+                if now - last_daily < timedelta(days=1):
+                    next_daily = last_daily + timedelta(days=1)
+                    await interaction.response.send_message(
+                        f"❌ You've already claimed your daily reward! Next daily available {discord.utils.format_dt(next_daily, 'R')}",
+                        ephemeral=True
+                    )
+                    return
+            
+            # Calculate streak bonus
+            streak_bonus = 0
+            if user_data["last_daily"]:
+                last_daily = datetime.fromisoformat(user_data["last_daily"])
+                if now - last_daily <= timedelta(days=2):  # Allow 1 day grace period
+                    streak_bonus = min(500, 50 * (user_data.get("daily_streak", 0)))
+            
+            total_reward = DAILY_REWARD + streak_bonus
+            
+            user_data["balance"] += total_reward
+            user_data["total_earned"] += total_reward
+            user_data["last_daily"] = now.isoformat()
+            user_data["daily_streak"] = user_data.get("daily_streak", 0) + 1
+            
+            self.update_user_data(str(interaction.user.id), user_data)
         
         embed = discord.Embed(
             title="🎁 Daily Reward Claimed!",
@@ -207,25 +181,26 @@ class EconomySystem(commands.Cog):
     @app_commands.command(name="weekly", description="Claim your weekly reward")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def weekly(self, interaction: discord.Interaction):
-        user_data = self.get_user_data(str(interaction.user.id))
-        
-        now = datetime.utcnow()
-        
-        if user_data["last_weekly"]:
-            last_weekly = datetime.fromisoformat(user_data["last_weekly"])
-            if now - last_weekly < timedelta(days=7):
-                next_weekly = last_weekly + timedelta(days=7)
-                await interaction.response.send_message(
-                    f"❌ You've already claimed your weekly reward! Next weekly available {discord.utils.format_dt(next_weekly, 'R')}",
-                    ephemeral=True
-                )
-                return
-        
-        user_data["balance"] += WEEKLY_REWARD
-        user_data["total_earned"] += WEEKLY_REWARD
-        user_data["last_weekly"] = now.isoformat()
-        
-        self.update_user_data(str(interaction.user.id), user_data)
+        async with self.store.locked("economy", str(interaction.user.id)):
+            user_data = self.get_user_data(str(interaction.user.id))
+            
+            now = datetime.utcnow()
+            
+            if user_data["last_weekly"]:
+                last_weekly = datetime.fromisoformat(user_data["last_weekly"])
+                if now - last_weekly < timedelta(days=7):
+                    next_weekly = last_weekly + timedelta(days=7)
+                    await interaction.response.send_message(
+                        f"❌ You've already claimed your weekly reward! Next weekly available {discord.utils.format_dt(next_weekly, 'R')}",
+                        ephemeral=True
+                    )
+                    return
+            
+            user_data["balance"] += WEEKLY_REWARD
+            user_data["total_earned"] += WEEKLY_REWARD
+            user_data["last_weekly"] = now.isoformat()
+            
+            self.update_user_data(str(interaction.user.id), user_data)
         
         embed = discord.Embed(
             title="🎊 Weekly Reward Claimed!",
@@ -241,45 +216,41 @@ class EconomySystem(commands.Cog):
     @app_commands.command(name="work", description="Work to earn money")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def work(self, interaction: discord.Interaction):
-        user_data = self.get_user_data(str(interaction.user.id))
-        
-        now = datetime.utcnow()
-        
-        if user_data["last_work"]:
-            last_work = datetime.fromisoformat(user_data["last_work"])
-            if now - last_work < timedelta(seconds=WORK_COOLDOWN):
-                next_work = last_work + timedelta(seconds=WORK_COOLDOWN)
-                await interaction.response.send_message(
-                    f"❌ You're tired from your last job! You can work again {discord.utils.format_dt(next_work, 'R')}",
-                    ephemeral=True
-                )
-                return
-        
-        # Calculate earnings
-        base_earnings = random.randint(WORK_REWARDS["min"], WORK_REWARDS["max"])
-        
-        # Bonus for vehicle owners (check if user has registered vehicles)
-        vehicle_bonus = 0
-        try:
-            vehicles_file = DATA_DIR / "vehicles.json"
-            if vehicles_file.exists():
-                with vehicles_file.open("r", encoding="utf-8") as f:
-                    vehicle_data = json.load(f)
-                
-                user_vehicles = [v for v in vehicle_data.get("vehicles", []) if v.get("userId") == str(interaction.user.id)]
-                if user_vehicles:
-                    vehicle_bonus = min(100, len(user_vehicles) * 25)  # $25 per vehicle, max $100
-        except:
-            pass
-        
-        total_earnings = base_earnings + vehicle_bonus
-        job = random.choice(JOBS)
-        
-        user_data["balance"] += total_earnings
-        user_data["total_earned"] += total_earnings
-        user_data["last_work"] = now.isoformat()
-        
-        self.update_user_data(str(interaction.user.id), user_data)
+        async with self.store.locked("economy", str(interaction.user.id)):
+            user_data = self.get_user_data(str(interaction.user.id))
+            
+            now = datetime.utcnow()
+            
+            if user_data["last_work"]:
+                last_work = datetime.fromisoformat(user_data["last_work"])
+                if now - last_work < timedelta(seconds=WORK_COOLDOWN):
+                    next_work = last_work + timedelta(seconds=WORK_COOLDOWN)
+                    await interaction.response.send_message(
+                        f"❌ You're tired from your last job! You can work again {discord.utils.format_dt(next_work, 'R')}",
+                        ephemeral=True
+                    )
+                    return
+            
+            # Calculate earnings
+            base_earnings = random.randint(WORK_REWARDS["min"], WORK_REWARDS["max"])
+            
+            # Bonus for vehicle owners (check if user has registered vehicles)
+            vehicle_bonus = 0
+            try:
+                vehicle_count = self.store.count_by("vehicles", "owner", str(interaction.user.id))
+                if vehicle_count:
+                    vehicle_bonus = min(100, vehicle_count * 25)  # $25 per vehicle, max $100
+            except:
+                pass
+            
+            total_earnings = base_earnings + vehicle_bonus
+            job = random.choice(JOBS)
+            
+            user_data["balance"] += total_earnings
+            user_data["total_earned"] += total_earnings
+            user_data["last_work"] = now.isoformat()
+            
+            self.update_user_data(str(interaction.user.id), user_data)
         
         embed = discord.Embed(
             title="💼 Work Complete!",
@@ -300,29 +271,30 @@ class EconomySystem(commands.Cog):
     @app_commands.describe(amount="Amount to deposit (or 'all' for everything)")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def deposit(self, interaction: discord.Interaction, amount: str):
-        user_data = self.get_user_data(str(interaction.user.id))
-        
-        if amount.lower() == "all":
-            deposit_amount = user_data["balance"]
-        else:
-            try:
-                deposit_amount = int(amount.replace(",", ""))
-            except ValueError:
-                await interaction.response.send_message("❌ Invalid amount. Use a number or 'all'.", ephemeral=True)
+        async with self.store.locked("economy", str(interaction.user.id)):
+            user_data = self.get_user_data(str(interaction.user.id))
+            
+            if amount.lower() == "all":
+                deposit_amount = user_data["balance"]
+            else:
+                try:
+                    deposit_amount = int(amount.replace(",", ""))
+                except ValueError:
+                    await interaction.response.send_message("❌ Invalid amount. Use a number or 'all'.", ephemeral=True)
+                    return
+            
+            if deposit_amount <= 0:
+                await interaction.response.send_message("❌ Amount must be positive.", ephemeral=True)
                 return
-        
-        if deposit_amount <= 0:
-            await interaction.response.send_message("❌ Amount must be positive.", ephemeral=True)
-            return
-        
-        if user_data["balance"] < deposit_amount:
-            await interaction.response.send_message("❌ You don't have enough money in your wallet.", ephemeral=True)
-            return
-        
-        user_data["balance"] -= deposit_amount
-        user_data["bank"] += deposit_amount
-        
-        self.update_user_data(str(interaction.user.id), user_data)
+            
+            if user_data["balance"] < deposit_amount:
+                await interaction.response.send_message("❌ You don't have enough money in your wallet.", ephemeral=True)
+                return
+            
+            user_data["balance"] -= deposit_amount
+            user_data["bank"] += deposit_amount
+            
+            self.update_user_data(str(interaction.user.id), user_data)
         
         embed = discord.Embed(
             title="🏦 Deposit Successful",
@@ -339,29 +311,30 @@ class EconomySystem(commands.Cog):
     @app_commands.describe(amount="Amount to withdraw (or 'all' for everything)")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
     async def withdraw(self, interaction: discord.Interaction, amount: str):
-        user_data = self.get_user_data(str(interaction.user.id))
-        
-        if amount.lower() == "all":
-            withdraw_amount = user_data["bank"]
-        else:
-            try:
-                withdraw_amount = int(amount.replace(",", ""))
-            except ValueError:
-                await interaction.response.send_message("❌ Invalid amount. Use a number or 'all'.", ephemeral=True)
+        async with self.store.locked("economy", str(interaction.user.id)):
+            user_data = self.get_user_data(str(interaction.user.id))
+            
+            if amount.lower() == "all":
+                withdraw_amount = user_data["bank"]
+            else:
+                try:
+                    withdraw_amount = int(amount.replace(",", ""))
+                except ValueError:
+                    await interaction.response.send_message("❌ Invalid amount. Use a number or 'all'.", ephemeral=True)
+                    return
+            
+            if withdraw_amount <= 0:
+                await interaction.response.send_message("❌ Amount must be positive.", ephemeral=True)
                 return
-        
-        if withdraw_amount <= 0:
-            await interaction.response.send_message("❌ Amount must be positive.", ephemeral=True)
-            return
-        
-        if user_data["bank"] < withdraw_amount:
-            await interaction.response.send_message("❌ You don't have enough money in your bank.", ephemeral=True)
-            return
-        
-        user_data["bank"] -= withdraw_amount
-        user_data["balance"] += withdraw_amount
-        
-        self.update_user_data(str(interaction.user.id), user_data)
+            
+            if user_data["bank"] < withdraw_amount:
+                await interaction.response.send_message("❌ You don't have enough money in your bank.", ephemeral=True)
+                return
+            
+            user_data["bank"] -= withdraw_amount
+            user_data["balance"] += withdraw_amount
+            
+            self.update_user_data(str(interaction.user.id), user_data)
         
         embed = discord.Embed(
             title="🏦 Withdrawal Successful",
@@ -390,18 +363,24 @@ class EconomySystem(commands.Cog):
             await interaction.response.send_message("❌ Amount must be positive.", ephemeral=True)
             return
         
-        sender_data = self.get_user_data(str(interaction.user.id))
-        
-        if sender_data["balance"] < amount:
-            await interaction.response.send_message("❌ You don't have enough money in your wallet.", ephemeral=True)
-            return
-        
-        # Transfer money
-        sender_data["balance"] -= amount
-        sender_data["total_spent"] += amount
-        self.update_user_data(str(interaction.user.id), sender_data)
+        async with self.store.locked("economy", str(interaction.user.id), str(user.id)):
+            sender_data = self.get_user_data(str(interaction.user.id))
+            
+            if sender_data["balance"] < amount:
+                await interaction.response.send_message("❌ You don't have enough money in your wallet.", ephemeral=True)
+                return
+            
+            # Transfer money
+            sender_data["balance"] -= amount
+            sender_data["total_spent"] += amount
+            self.update_user_data(str(interaction.user.id), sender_data)
+            
+            self.add_money(str(user.id), amount)
         
-        self.add_money(str(user.id), amount)
+        self.bot.activity.record(
+            "economy.payment", f"{interaction.user.display_name} paid ${amount:,} to {user.display_name}",
+            actor_id=interaction.user.id, target_id=user.id, amount=amount
+        )
         
         embed = discord.Embed(
             title="💸 Payment Sent",
@@ -430,23 +409,18 @@ class EconomySystem(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            with ECONOMY_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            # Calculate total wealth for each user
+            # Walk the maintained ranking from the top until we have 10 current members
+            leaderboard = self.bot.leaderboard
             user_wealth = []
-            for user_id, user_data in data["users"].items():
-                total_wealth = user_data["balance"] + user_data["bank"]
-                if total_wealth > 0:  # Only include users with money
-                    try:
-                        user = interaction.guild.get_member(int(user_id))
-                        if user:  # Only include current guild members
-                            user_wealth.append((user, total_wealth))
-                    except:
-                        continue
-            
-            # Sort by wealth
-            user_wealth.sort(key=lambda x: x[1], reverse=True)
+            for user_id, wealth in leaderboard.ranked():
+                if wealth <= 0 or len(user_wealth) >= 10:  # Only include users with money
+                    break
+                try:
+                    user = interaction.guild.get_member(int(user_id))
+                    if user:  # Only include current guild members
+                        user_wealth.append((user, wealth))
+                except:
+                    continue
             
             if not user_wealth:
                 await interaction.followup.send("❌ No users found on the leaderboard.", ephemeral=True)
@@ -460,7 +434,7 @@ class EconomySystem(commands.Cog):
             )
             
             # Show top 10
-            for i, (user, wealth) in enumerate(user_wealth[:10], 1):
+            for i, (user, wealth) in enumerate(user_wealth, 1):
                 medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
                 embed.add_field(
                     name=f"{medal} {user.display_name}",
@@ -469,15 +443,10 @@ class EconomySystem(commands.Cog):
                 )
             
             # Show user's position if not in top 10
-            user_position = None
-            for i, (user, wealth) in enumerate(user_wealth, 1):
-                if user.id == interaction.user.id:
-                    user_position = i
-                    break
+            user_wealth_total = leaderboard.wealth(str(interaction.user.id)) or 0
+            user_position = leaderboard.rank(str(interaction.user.id)) if user_wealth_total > 0 else None
             
-            if user_position and user_position > 10:
-                user_data = self.get_user_data(str(interaction.user.id))
-                user_wealth_total = user_data["balance"] + user_data["bank"]
+            if user_position and all(user.id != interaction.user.id for user, _ in user_wealth):
                 embed.add_field(
                     name=f"Your Position: #{user_position}",
                     value=f"${user_wealth_total:,}",
@@ -1,10 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import os
-from datetime import datetime, timedelta
-from pathlib import Path
+from datetime import datetime
 import logging
 from typing import Optional, List, Dict
 import asyncio
@@ -12,8 +10,6 @@ import asyncio
 logger = logging.getLogger(__name__)
 
 GUILD_ID = int(os.getenv("GUILD_ID", "1277047315047120978"))
-DATA_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / ".." / "data"
-SESSIONS_FILE = DATA_DIR / "sessions.json"
 
 class SessionManagementView(discord.ui.View):
     def __init__(self, session_data: Dict):
@@ -30,17 +26,13 @@ class SessionManagementView(discord.ui.View):
             
             # Update session data
             try:
-                with SESSIONS_FILE.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
+                store = interaction.client.datastore
                 
                 # Find and update the session
-                for session in data.get("sessions", []):
-                    if session["id"] == self.session_data["id"]:
-                        session["participants"] = self.session_data["participants"]
-                        break
-                
-                with SESSIONS_FILE.open("w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2)
+                session = store.get("sessions", self.session_data["id"])
+                if session:
+                    session["participants"] = self.session_data["participants"]
+                    store.put("sessions", session)
                 
                 await interaction.response.send_message("✅ You've joined the session!", ephemeral=True)
             except Exception as e:
@@ -58,17 +50,13 @@ class SessionManagementView(discord.ui.View):
             
             # Update session data
             try:
-                with SESSIONS_FILE.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
+                store = interaction.client.datastore
                 
                 # Find and update the session
-                for session in data.get("sessions", []):
-                    if session["id"] == self.session_data["id"]:
-                        session["participants"] = self.session_data["participants"]
-                        break
-                
-                with SESSIONS_FILE.open("w", encoding="utf-8") as f:
-                    json.dump(data, f, indent=2)
+                session = store.get("sessions", self.session_data["id"])
+                if session:
+                    session["participants"] = self.session_data["participants"]
+                    store.put("sessions", session)
                 
                 await interaction.response.send_message("✅ You've left the session.", ephemeral=True)
             except Exception as e:
@@ -113,14 +101,7 @@ class SessionManagementView(discord.ui.View):
 class EnhancedSessionManagement(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        DATA_DIR.mkdir(exist_ok=True)
-        self.ensure_sessions_file()
-    
-    def ensure_sessions_file(self):
-        """Ensure sessions data file exists"""
-        if not SESSIONS_FILE.exists():
-            with SESSIONS_FILE.open("w", encoding="utf-8") as f:
-                json.dump({"sessions": []}, f, indent=2)
+        self.store = bot.datastore
     
     def is_staff(self, user: discord.Member) -> bool:
         """Check if user has staff permissions"""
@@ -153,12 +134,8 @@ class EnhancedSessionManagement(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            # Load existing sessions
-            with SESSIONS_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
             # Create new session
-            session_id = len(data["sessions"]) + 1
+            session_id = self.store.next_id("sessions")
             session_data = {
                 "id": session_id,
                 "host_id": str(interaction.user.id),
@@ -173,11 +150,9 @@ class EnhancedSessionManagement(commands.Cog):
                 "ended_at": None
             }
             
-            data["sessions"].append(session_data)
-            
             # Save sessions data
-            with SESSIONS_FILE.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            self.store.put("sessions", session_data)
+            self.bot.activity.record("session.created", f"Session #{session_id} created", actor_id=interaction.user.id)
             
             # Create session embed
             embed = discord.Embed(
@@ -237,33 +212,28 @@ class EnhancedSessionManagement(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            with SESSIONS_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
             # Find and update session
-            session_found = False
-            for session in data["sessions"]:
-                if session["id"] == session_id:
-                    # Check if user is host or has admin permissions
-                    if (session["host_id"] != str(interaction.user.id) and 
-                        not interaction.user.guild_permissions.administrator):
-                        await interaction.followup.send("❌ You can only update your own sessions.", ephemeral=True)
-                        return
-                    
-                    session["status"] = status.value
-                    if status.value == "Ended":
-                        session["ended_at"] = datetime.utcnow().isoformat()
-                    
-                    session_found = True
-                    break
-            
-            if not session_found:
+            session = self.store.get("sessions", session_id)
+            if not session:
                 await interaction.followup.send("❌ Session not found.", ephemeral=True)
                 return
             
+            # Check if user is host or has admin permissions
+            if (session["host_id"] != str(interaction.user.id) and 
+                not interaction.user.guild_permissions.administrator):
+                await interaction.followup.send("❌ You can only update your own sessions.", ephemeral=True)
+                return
+            
+            session["status"] = status.value
+            if status.value == "Ended":
+                session["ended_at"] = datetime.utcnow().isoformat()
+            
             # Save updated data
-            with SESSIONS_FILE.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            self.store.put("sessions", session)
+            self.bot.activity.record(
+                "session.updated", f"Session #{session_id} is now {status.value}",
+                actor_id=interaction.user.id, status=status.value
+            )
             
             embed = discord.Embed(
                 title="✅ Session Updated",
@@ -283,10 +253,7 @@ class EnhancedSessionManagement(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            with SESSIONS_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            active_sessions = [s for s in data["sessions"] if s["status"] != "Ended"]
+            active_sessions = [s for s in self.store.all("sessions") if s["status"] != "Ended"]
             
             if not active_sessions:
                 await interaction.followup.send("❌ No active sessions found.", ephemeral=True)
@@ -333,36 +300,18 @@ class EnhancedSessionManagement(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            with SESSIONS_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            sessions = data.get("sessions", [])
+            stats = self.bot.session_stats
             
-            if not sessions:
+            if not stats.total:
                 await interaction.followup.send("❌ No session data found.", ephemeral=True)
                 return
             
-            # Calculate statistics
-            total_sessions = len(sessions)
-            active_sessions = len([s for s in sessions if s["status"] != "Ended"])
-            ended_sessions = len([s for s in sessions if s["status"] == "Ended"])
-            
-            # Host statistics
-            host_counts = {}
-            for session in sessions:
-                host_id = session["host_id"]
-                host_counts[host_id] = host_counts.get(host_id, 0) + 1
-            
-            top_hosts = sorted(host_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-            
-            # Recent activity (last 7 days)
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            recent_sessions = 0
-            
-            for session in sessions:
-                created_at = datetime.fromisoformat(session["created_at"])
-                if created_at >= week_ago:
-                    recent_sessions += 1
+            # Counters are kept up to date as sessions are written (utils/session_stats.py)
+            total_sessions = stats.total
+            active_sessions = stats.active
+            ended_sessions = stats.ended
+            top_hosts = stats.top_hosts(5)
+            recent_sessions = stats.recent(7)
             
             embed = discord.Embed(
                 title="📊 Session Statistics",
@@ -387,6 +336,11 @@ class EnhancedSessionManagement(commands.Cog):
                 
                 embed.add_field(name="🏆 Top Hosts", value="\n".join(host_list), inline=True)
             
+            weekly = stats.weekly(4)
+            embed.add_field(name="📅 Last 4 Weeks",
+                          value="\n".join(f"{week}: **{count}**" for week, count in weekly),
+                          inline=False)
+            
             embed.set_footer(text="MGVRP Session Management")
             
             await interaction.followup.send(embed=embed, ephemeral=True)
@@ -1,10 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import os
 from datetime import datetime
-from pathlib import Path
 import logging
 from typing import Optional, List, Dict, Any
 import asyncio
@@ -15,8 +13,6 @@ logger = logging.getLogger(__name__)
 GUILD_ID = int(os.getenv("GUILD_ID", "1277047315047120978"))
 VEHICLE_REGISTRY_CHANNEL = int(os.getenv("VEHICLE_REGISTRY_CHANNEL", "1339746547826556938"))
 ECONOMY_CHANNEL = int(os.getenv("ECONOMY_CHANNEL", "1403779808135090186"))
-DATA_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / ".." / "data"
-VEHICLES_FILE = DATA_DIR / "vehicles.json"
 
 # Valid US state codes and Canadian provinces
 VALID_STATES = {
@@ -39,10 +35,12 @@ VEHICLE_CATEGORIES = {
 }
 
 class VehicleSearchView(discord.ui.View):
-    def __init__(self, vehicles: List[Dict], query: str, page: int = 0):
+    def __init__(self, vehicles: List[Dict], query: str, page: int = 0, state: Optional[str] = None, owner_id: Optional[str] = None):
         super().__init__(timeout=300)
         self.vehicles = vehicles
         self.query = query
+        self.state = state
+        self.owner_id = owner_id
         self.page = page
         self.per_page = 5
         self.max_page = (len(vehicles) - 1) // self.per_page
@@ -97,11 +95,8 @@ class VehicleSearchView(discord.ui.View):
     async def refresh(self, interaction: discord.Interaction, button: discord.ui.Button):
         # Reload data and refresh results
         try:
-            with VEHICLES_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
             # Re-run search with current query
-            self.vehicles = self.search_vehicles(data.get('vehicles', []), self.query)
+            self.vehicles = interaction.client.vehicle_search.search(self.query, state=self.state, owner_id=self.owner_id)
             self.max_page = (len(self.vehicles) - 1) // self.per_page if self.vehicles else 0
             self.page = min(self.page, self.max_page)
             self.update_buttons()
@@ -110,20 +105,6 @@ class VehicleSearchView(discord.ui.View):
         except Exception as e:
             await interaction.response.send_message("❌ Error refreshing data.", ephemeral=True)
     
-    def search_vehicles(self, vehicles: List[Dict], query: str) -> List[Dict]:
-        """Enhanced search functionality"""
-        query = query.lower()
-        results = []
-        
-        for vehicle in vehicles:
-            # Search in multiple fields
-            searchable_text = f"{vehicle.get('make', '')} {vehicle.get('model', '')} {vehicle.get('color', '')} {vehicle.get('plate', '')} {vehicle.get('state', '')}".lower()
-            
-            if query in searchable_text:
-                results.append(vehicle)
-        
-        return results
-
 class VehicleTransferModal(discord.ui.Modal, title="Transfer Vehicle"):
     plate = discord.ui.TextInput(label="License Plate", placeholder="Enter the license plate")
     state = discord.ui.TextInput(label="State", placeholder="Enter the state code")
@@ -133,28 +114,25 @@ class VehicleTransferModal(discord.ui.Modal, title="Transfer Vehicle"):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            with VEHICLES_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
+            store = interaction.client.datastore
             plate_upper = self.plate.value.upper()
             state_upper = self.state.value.upper()
             
             # Find the vehicle
-            vehicle_found = False
-            for vehicle in data.get('vehicles', []):
-                if vehicle['plate'] == plate_upper and vehicle['state'] == state_upper:
-                    old_owner = vehicle['userId']
-                    vehicle['userId'] = self.new_owner.value
-                    vehicle_found = True
-                    break
-            
-            if not vehicle_found:
+            vehicle = store.get("vehicles", (plate_upper, state_upper))
+            if not vehicle:
                 await interaction.followup.send(f"❌ Vehicle with plate **{plate_upper}** in **{state_upper}** not found.", ephemeral=True)
                 return
             
+            old_owner = vehicle['userId']
+            vehicle['userId'] = self.new_owner.value
+            
             # Save the updated data
-            with VEHICLES_FILE.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            store.put("vehicles", vehicle)
+            interaction.client.activity.record(
+                "vehicle.transferred", f"Vehicle {plate_upper} ({state_upper}) transferred",
+                actor_id=interaction.user.id, target_id=self.new_owner.value, from_user=old_owner
+            )
             
             embed = discord.Embed(
                 title="🔄 Vehicle Transferred",
@@ -173,7 +151,7 @@ class VehicleTransferModal(discord.ui.Modal, title="Transfer Vehicle"):
 class EnhancedVehicleSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        DATA_DIR.mkdir(exist_ok=True)
+        self.store = bot.datastore
     
     @app_commands.command(name="vehicle_search", description="Advanced vehicle search with filters")
     @app_commands.describe(
@@ -185,37 +163,15 @@ class EnhancedVehicleSystem(commands.Cog):
     async def vehicle_search(self, interaction: discord.Interaction, query: str, state: Optional[str] = None, owner: Optional[discord.User] = None):
         await interaction.response.defer(ephemeral=True)
         
-        try:
-            with VEHICLES_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            await interaction.followup.send("❌ Error loading vehicle database.", ephemeral=True)
-            return
-        
-        vehicles = data.get('vehicles', [])
-        
-        # Apply filters
-        if state:
-            vehicles = [v for v in vehicles if v.get('state', '').upper() == state.upper()]
-        
-        if owner:
-            vehicles = [v for v in vehicles if v.get('userId') == str(owner.id)]
-        
-        # Apply search query
-        if query:
-            query_lower = query.lower()
-            filtered_vehicles = []
-            for vehicle in vehicles:
-                searchable = f"{vehicle.get('make', '')} {vehicle.get('model', '')} {vehicle.get('color', '')} {vehicle.get('plate', '')}".lower()
-                if query_lower in searchable:
-                    filtered_vehicles.append(vehicle)
-            vehicles = filtered_vehicles
+        # Ranked lookup in the search index (prefix and typo tolerant)
+        owner_id = str(owner.id) if owner else None
+        vehicles = self.bot.vehicle_search.search(query, state=state, owner_id=owner_id)
         
         if not vehicles:
             await interaction.followup.send("❌ No vehicles found matching your criteria.", ephemeral=True)
             return
         
-        view = VehicleSearchView(vehicles, query)
+        view = VehicleSearchView(vehicles, query, state=state, owner_id=owner_id)
         await interaction.followup.send(embed=view.get_embed(), view=view, ephemeral=True)
     
     @app_commands.command(name="vehicle_stats", description="Get comprehensive vehicle statistics")
@@ -223,58 +179,18 @@ class EnhancedVehicleSystem(commands.Cog):
     async def vehicle_stats(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         
-        try:
-            with VEHICLES_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            await interaction.followup.send("❌ Error loading vehicle database.", ephemeral=True)
-            return
+        # Maintained incrementally by the store, so no scan is needed here
+        stats = self.bot.vehicle_stats
         
-        vehicles = data.get('vehicles', [])
-        
-        if not vehicles:
+        if not stats.total:
             await interaction.followup.send("❌ No vehicles in database.", ephemeral=True)
             return
         
-        # Calculate statistics
-        total_vehicles = len(vehicles)
-        
-        # State distribution
-        state_counts = {}
-        for vehicle in vehicles:
-            state = vehicle.get('state', 'Unknown')
-            state_counts[state] = state_counts.get(state, 0) + 1
-        
-        top_states = sorted(state_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        # Make distribution
-        make_counts = {}
-        for vehicle in vehicles:
-            make = vehicle.get('make', 'Unknown').title()
-            make_counts[make] = make_counts.get(make, 0) + 1
-        
-        top_makes = sorted(make_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        # Color distribution
-        color_counts = {}
-        for vehicle in vehicles:
-            color = vehicle.get('color', 'Unknown').title()
-            color_counts[color] = color_counts.get(color, 0) + 1
-        
-        top_colors = sorted(color_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-        
-        # Recent registrations (last 7 days)
-        from datetime import timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_vehicles = 0
-        
-        for vehicle in vehicles:
-            try:
-                reg_date = datetime.fromisoformat(vehicle['registeredAt'].replace('Z', '+00:00'))
-                if reg_date >= week_ago:
-                    recent_vehicles += 1
-            except:
-                continue
+        total_vehicles = stats.total
+        recent_vehicles = stats.recent(7)
+        top_states = stats.top(stats.by_state)
+        top_makes = stats.top(stats.by_make)
+        top_colors = stats.top(stats.by_color)
         
         embed = discord.Embed(
             title="📊 Vehicle Database Statistics",
@@ -323,14 +239,7 @@ class EnhancedVehicleSystem(commands.Cog):
     async def my_vehicles(self, interaction: discord.Interaction):
         await interaction.response.defer(ephemeral=True)
         
-        try:
-            with VEHICLES_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception as e:
-            await interaction.followup.send("❌ Error loading vehicle database.", ephemeral=True)
-            return
-        
-        user_vehicles = [v for v in data.get('vehicles', []) if v.get('userId') == str(interaction.user.id)]
+        user_vehicles = self.store.find("vehicles", "owner", str(interaction.user.id))
         
         if not user_vehicles:
             await interaction.followup.send("❌ You don't have any registered vehicles.", ephemeral=True)
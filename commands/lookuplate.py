@@ -1,10 +1,8 @@
 import os
-import json
 import discord
 from discord.ext import commands
 from discord import app_commands
 import logging
-from pathlib import Path
 from datetime import datetime
 
 # Set up logging
@@ -12,8 +10,6 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Configuration
-DATA_DIR = Path(os.getcwd()) / 'data'
-VEHICLES_FILE = DATA_DIR / 'vehicles.json'
 GUILD_ID = int(os.getenv('GUILD_ID', '1277047315047120978'))
 LAW_ENFORCEMENT_ROLE = os.getenv('LAW_ENFORCEMENT_ROLE', 'Law Enforcement')  # Configurable role name
 
@@ -104,37 +100,7 @@ class PaginationView(discord.ui.View):
 class LookupPlate(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.vehicle_index = {}
-        DATA_DIR.mkdir(exist_ok=True)
-        self._build_index()
-
-    def _build_index(self):
-        """Build an in-memory index for faster lookups."""
-        try:
-            if not VEHICLES_FILE.exists():
-                logger.warning(f"Vehicle data file not found: {VEHICLES_FILE}. Creating empty file.")
-                with VEHICLES_FILE.open('w', encoding='utf-8') as f:
-                    json.dump({"vehicles": []}, f, indent=2)
-                return
-            with VEHICLES_FILE.open('r', encoding='utf-8') as f:
-                vehicle_data = json.load(f)
-            if not isinstance(vehicle_data, dict) or 'vehicles' not in vehicle_data:
-                logger.error("Invalid vehicle data format. Resetting to empty.")
-                vehicle_data = {"vehicles": []}
-                with VEHICLES_FILE.open('w', encoding='utf-8') as f:
-                    json.dump(vehicle_data, f, indent=2)
-            for vehicle in vehicle_data.get('vehicles', []):
-                key = (vehicle['plate'].upper(), vehicle['state'].upper())
-                self.vehicle_index[key] = vehicle
-            logger.info(f"Built vehicle index with {len(self.vehicle_index)} entries")
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse vehicles.json: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error building index: {e}")
-
-    def cog_unload(self):
-        """Clear index on cog unload."""
-        self.vehicle_index.clear()
+        self.store = bot.datastore
 
     @app_commands.command(name="lookuplate", description="Look up vehicles by license plate")
     @app_commands.describe(plate="License plate (2-8 alphanumeric characters or hyphens)", state="State code (e.g., TX, CA), optional")
@@ -142,19 +108,6 @@ class LookupPlate(commands.Cog):
     async def lookuplate(self, interaction: discord.Interaction, plate: str, state: str = None):
         await interaction.response.defer(ephemeral=True)
 
-        # Always reload vehicles.json for up-to-date results
-        vehicle_index = {}
-        try:
-            with VEHICLES_FILE.open('r', encoding='utf-8') as f:
-                vehicle_data = json.load(f)
-            for vehicle in vehicle_data.get('vehicles', []):
-                key = (vehicle['plate'].upper(), vehicle['state'].upper())
-                vehicle_index[key] = vehicle
-        except Exception as e:
-            logger.error(f"Error loading vehicles.json: {e}")
-            await interaction.followup.send("❌ Could not load vehicle data.", ephemeral=True)
-            return
-
         # Validate inputs
         plate = plate.strip().upper()
         if not (2 <= len(plate) <= 8 and all(c.isalnum() or c == '-' for c in plate)):
@@ -174,7 +127,7 @@ class LookupPlate(commands.Cog):
 
         # Check index
         if state:
-            vehicle = vehicle_index.get((plate, state))
+            vehicle = self.store.get("vehicles", (plate, state))
             if not vehicle:
                 await interaction.followup.send(
                     f"❌ No vehicle found with plate **{plate}** in **{state}**.",
@@ -183,7 +136,7 @@ class LookupPlate(commands.Cog):
                 return
             vehicles = [vehicle]
         else:
-            vehicles = [v for k, v in vehicle_index.items() if k[0] == plate]
+            vehicles = self.store.find("vehicles", "plate", plate)
 
         if not vehicles:
             await interaction.followup.send(
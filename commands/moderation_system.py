@@ -1,7 +1,6 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-import json
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -9,13 +8,12 @@ import logging
 from typing import Optional, List
 import asyncio
 
+from utils.mod_log import moderation_embed
+
 logger = logging.getLogger(__name__)
 
 GUILD_ID = int(os.getenv("GUILD_ID", "1277047315047120978"))
-MOD_LOG_CHANNEL = int(os.getenv("MOD_LOG_CHANNEL", "1339764330425487460"))
 DATA_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / ".." / "data"
-WARNINGS_FILE = DATA_DIR / "warnings.json"
-MUTES_FILE = DATA_DIR / "mutes.json"
 
 # Moderation roles
 MOD_ROLES = [
@@ -26,15 +24,9 @@ MOD_ROLES = [
 class ModerationSystem(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.store = bot.datastore
+        self.timeouts = bot.timeouts
         DATA_DIR.mkdir(exist_ok=True)
-        self.ensure_files_exist()
-    
-    def ensure_files_exist(self):
-        """Ensure moderation data files exist"""
-        for file_path in [WARNINGS_FILE, MUTES_FILE]:
-            if not file_path.exists():
-                with file_path.open("w", encoding="utf-8") as f:
-                    json.dump({"data": []}, f, indent=2)
     
     def is_moderator(self, user: discord.Member) -> bool:
         """Check if user has moderation permissions"""
@@ -49,32 +41,37 @@ class ModerationSystem(commands.Cog):
     
     async def log_action(self, guild: discord.Guild, action: str, moderator: discord.Member, target: discord.Member, reason: str, duration: Optional[str] = None):
         """Log moderation actions"""
+        self.bot.activity.record(
+            f"moderation.{action.lower().replace(' ', '_')}",
+            f"{action}: {target.display_name} by {moderator.display_name}",
+            actor_id=moderator.id, target_id=target.id, reason=reason, duration=duration
+        )
+        
         try:
-            log_channel = guild.get_channel(MOD_LOG_CHANNEL)
-            if not log_channel:
-                return
-            
-            embed = discord.Embed(
-                title=f"🛡️ Moderation Action: {action}",
-                color=0xff6b6b,
-                timestamp=datetime.utcnow()
-            )
-            
-            embed.add_field(name="Target", value=f"{target.mention} ({target.id})", inline=True)
-            embed.add_field(name="Moderator", value=f"{moderator.mention} ({moderator.id})", inline=True)
-            embed.add_field(name="Reason", value=reason or "No reason provided", inline=False)
-            
-            if duration:
-                embed.add_field(name="Duration", value=duration, inline=True)
-            
-            embed.set_thumbnail(url=target.avatar.url if target.avatar else target.default_avatar.url)
-            embed.set_footer(text="MGVRP Moderation System")
-            
-            await log_channel.send(embed=embed)
-            
+            # Queued and sent in batches, see utils/mod_log.py
+            self.bot.mod_log.send(moderation_embed(action, moderator, target, reason, duration))
         except Exception as e:
             logger.error(f"Error logging moderation action: {e}")
     
+    @commands.Cog.listener()
+    async def on_timeout_expire(self, record: dict):
+        """Log timeouts that ran out (dispatched by the timeout ledger)"""
+        guild = self.bot.get_guild(int(record["guild_id"]))
+        member = guild.get_member(int(record["user_id"])) if guild else None
+        if member is None:
+            self.bot.activity.record(
+                "moderation.timeout_expired", f"Timeout Expired: User#{record['user_id']}",
+                target_id=record["user_id"], reason=record.get("reason")
+            )
+            return
+        await self.log_action(guild, "Timeout Expired", guild.me, member, record.get("reason"), record.get("duration"))
+    
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        # Timeouts lifted from Discord itself rather than /untimeout
+        if before.timed_out_until and not after.timed_out_until:
+            self.timeouts.remove(after.id)
+    
     @app_commands.command(name="warn", description="Warn a user")
     @app_commands.describe(user="User to warn", reason="Reason for the warning")
     @app_commands.guilds(discord.Object(id=GUILD_ID))
@@ -86,13 +83,9 @@ class ModerationSystem(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            # Load warnings data
-            with WARNINGS_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
             # Add new warning
             warning = {
-                "id": len(data["data"]) + 1,
+                "id": self.store.next_id("warnings"),
                 "user_id": str(user.id),
                 "moderator_id": str(interaction.user.id),
                 "reason": reason,
@@ -100,15 +93,11 @@ class ModerationSystem(commands.Cog):
                 "guild_id": str(interaction.guild.id)
             }
             
-            data["data"].append(warning)
-            
             # Save warnings data
-            with WARNINGS_FILE.open("w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            self.store.put("warnings", warning)
             
             # Count user's warnings
-            user_warnings = [w for w in data["data"] if w["user_id"] == str(user.id)]
-            warning_count = len(user_warnings)
+            warning_count = self.store.count_by("warnings", "user", str(user.id))
             
             # Send warning to user
             try:
@@ -155,10 +144,7 @@ class ModerationSystem(commands.Cog):
         await interaction.response.defer(ephemeral=True)
         
         try:
-            with WARNINGS_FILE.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            
-            user_warnings = [w for w in data["data"] if w["user_id"] == str(user.id)]
+            user_warnings = self.store.find("warnings", "user", str(user.id))
             
             if not user_warnings:
                 await interaction.followup.send(f"✅ {user.mention} has no warnings.", ephemeral=True)
@@ -228,6 +214,7 @@ class ModerationSystem(commands.Cog):
             # Apply timeout
             timeout_until = datetime.utcnow() + timedelta(seconds=duration_seconds)
             await user.timeout(timeout_until, reason=reason)
+            self.timeouts.record(user.id, interaction.guild.id, interaction.user.id, timeout_until, duration, reason)
             
             # Log the action
             await self.log_action(interaction.guild, "Timeout", interaction.user, user, reason, duration)
@@ -279,6 +266,7 @@ class ModerationSystem(commands.Cog):
         
         try:
             await user.timeout(None, reason=reason)
+            self.timeouts.remove(user.id)
             
             # Log the action
             await self.log_action(interaction.guild, "Timeout Removed", interaction.user, user, reason)
@@ -1,5 +1,6 @@
 import os
 import json
+import asyncio
 import discord
 from discord.ext import commands
 from discord import app_commands
@@ -16,7 +17,6 @@ GUILD_ID = int(os.getenv("GUILD_ID", "1277047315047120978"))
 VEHICLE_REGISTRY_CHANNEL = int(os.getenv("VEHICLE_REGISTRY_CHANNEL", "1339746547826556938"))
 ECONOMY_CHANNEL = int(os.getenv("ECONOMY_CHANNEL", "1403779808135090186"))
 DATA_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / ".." / "data"
-VEHICLES_FILE = DATA_DIR / "vehicles.json"
 STICKY_FILE = DATA_DIR / "sticky.json"
 
 # Valid US state codes
@@ -98,23 +98,33 @@ class RegisterVehicle(commands.Cog):
         self.bot = bot
         self.last_sticky_id = None
         DATA_DIR.mkdir(exist_ok=True)
-        self._load_sticky_id()
 
-    def _load_sticky_id(self):
+    async def cog_load(self):
+        await self._load_sticky_id()
+
+    @staticmethod
+    def _read_sticky_file():
+        if not STICKY_FILE.exists():
+            return None
+        with STICKY_FILE.open("r", encoding="utf-8") as f:
+            return json.load(f).get("last_sticky_id")
+
+    @staticmethod
+    def _write_sticky_file(sticky_id):
+        with STICKY_FILE.open("w", encoding="utf-8") as f:
+            json.dump({"last_sticky_id": sticky_id}, f, indent=2)
+
+    async def _load_sticky_id(self):
         """Load the last sticky message ID from file."""
         try:
-            if STICKY_FILE.exists():
-                with STICKY_FILE.open("r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.last_sticky_id = data.get("last_sticky_id")
+            self.last_sticky_id = await asyncio.to_thread(self._read_sticky_file)
         except (json.JSONDecodeError, Exception) as e:
             logger.error(f"Failed to load sticky ID: {e}")
 
-    def _save_sticky_id(self, sticky_id):
+    async def _save_sticky_id(self, sticky_id):
         """Save the sticky message ID to file."""
         try:
-            with STICKY_FILE.open("w", encoding="utf-8") as f:
-                json.dump({"last_sticky_id": sticky_id}, f, indent=2)
+            await asyncio.to_thread(self._write_sticky_file, sticky_id)
             self.last_sticky_id = sticky_id
         except Exception as e:
             logger.error(f"Failed to save sticky ID: {e}")
@@ -129,49 +139,30 @@ class RegisterVehicle(commands.Cog):
     async def process_registration(self, interaction: discord.Interaction, make: str, model: str, color: str, state: str, plate: str):
         """Process the vehicle registration after modal submission"""
         try:
-            # Load or create vehicle data
-            try:
-                vehicle_data = {"vehicles": []}
-                if VEHICLES_FILE.exists():
-                    with VEHICLES_FILE.open("r", encoding="utf-8") as f:
-                        vehicle_data = json.load(f)
-                    if not isinstance(vehicle_data, dict) or "vehicles" not in vehicle_data:
-                        logger.error("Invalid vehicle data format")
-                        await interaction.followup.send("❌ Invalid vehicle data format. Contact the administrator.", ephemeral=True)
-                        return
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse vehicles.json: {e}")
-                await interaction.followup.send("❌ Error reading vehicle data. Contact the administrator.", ephemeral=True)
-                return
-            except Exception as e:
-                logger.error(f"Unexpected error reading vehicles.json: {e}")
-                await interaction.followup.send("❌ An unexpected error occurred. Contact the administrator.", ephemeral=True)
-                return
+            store = self.bot.datastore
 
             # Check for duplicate plate in same state
-            if any(v["plate"] == plate and v["state"] == state for v in vehicle_data["vehicles"]):
+            if store.exists("vehicles", (plate, state)):
                 await interaction.followup.send(f"❌ A vehicle with plate **{plate}** is already registered in **{state}**.", ephemeral=True)
                 return
 
             # Add new vehicle
-            vehicle_data["vehicles"].append({
-                "userId": str(interaction.user.id),
-                "make": make,
-                "model": model,
-                "color": color,
-                "state": state,
-                "plate": plate,
-                "registeredAt": datetime.utcnow().isoformat()
-            })
-
-            # Save vehicle data
             try:
-                with VEHICLES_FILE.open("w", encoding="utf-8") as f:
-                    json.dump(vehicle_data, f, indent=2)
+                store.put("vehicles", {
+                    "userId": str(interaction.user.id),
+                    "make": make,
+                    "model": model,
+                    "color": color,
+                    "state": state,
+                    "plate": plate,
+                    "registeredAt": datetime.utcnow().isoformat()
+                })
             except Exception as e:
                 logger.error(f"Failed to save vehicles.json: {e}")
                 await interaction.followup.send("❌ Failed to save vehicle data. Contact the administrator.", ephemeral=True)
                 return
+            
+            self.bot.activity.record("vehicle.registered", f"Vehicle {plate} ({state}) registered", actor_id=interaction.user.id)
 
             # Create vehicle registration embed
             embed = discord.Embed(
@@ -222,7 +213,7 @@ class RegisterVehicle(commands.Cog):
             
             try:
                 sticky_msg = await channel.send(embed=sticky_embed)
-                self._save_sticky_id(sticky_msg.id)
+                await self._save_sticky_id(sticky_msg.id)
             except discord.Forbidden:
                 logger.error(f"Missing permissions to send sticky message to channel: {VEHICLE_REGISTRY_CHANNEL}")
                 await interaction.followup.send("✅ Vehicle registered, but couldn't send sticky message (missing permissions).", ephemeral=True)
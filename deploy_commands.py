@@ -3,7 +3,11 @@ import discord
 from discord.ext import commands
 from dotenv import load_dotenv
 
+# Before importing utils: their settings are read from the environment
 load_dotenv()
+
+from utils.services import attach_services, close_services
+
 TOKEN = os.getenv('TOKEN')
 GUILD_ID = int(os.getenv('GUILD_ID', '1277047315047120978'))
 
@@ -12,6 +16,9 @@ intents = discord.Intents.default()
 intents.message_content = True  # Enable message content intent for prefix commands
 bot = commands.Bot(command_prefix='!', intents=intents)
 
+# The cogs expect the same services bot.py provides (bot.datastore, bot.timeouts, ...)
+attach_services(bot)
+
 # Load all command extensions from the commands folder
 async def load_commands():
     for filename in os.listdir('./commands'):
@@ -44,4 +51,5 @@ async def on_ready():
         print(f'❌ Error deploying commands: {e}')
 
 # Run the bot
-bot.run(TOKEN)
\ No newline at end of file
+bot.run(TOKEN)
+close_services(bot)
\ No newline at end of file
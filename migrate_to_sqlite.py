@@ -0,0 +1,19 @@
+import sys
+import logging
+
+from utils.sqlite_backend import DATABASE_PATH, migrate_json_to_sqlite
+
+# Set up logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """Copy data/*.json into the SQLite storage database. Pass --force to re-import."""
+    force = "--force" in sys.argv
+    imported = migrate_json_to_sqlite(force=force)
+    logger.info(f"Migration to {DATABASE_PATH} complete: {imported}")
+    logger.info("Set STORAGE_BACKEND=sqlite in your .env to use the new database.")
+
+if __name__ == "__main__":
+    main()
@@ -23,39 +23,43 @@ VALID_STATES = {
     "SC", "SD", "TN", "TX", "UT", "VT", "VA", "WA", "WV", "WI", "WY"
 }
 
-def validate_vehicle(vehicle):
-    """Validate a vehicle entry against cog requirements."""
+def vehicle_error(vehicle):
+    """Why a vehicle entry fails the cog requirements, or None if it is valid."""
     required_fields = {"userId", "make", "model", "color", "state", "plate", "registeredAt"}
-    if not all(field in vehicle for field in required_fields):
-        logger.warning(f"Missing fields in vehicle: {vehicle}")
-        return False
+    missing = sorted(required_fields - set(vehicle))
+    if missing:
+        return f"Missing fields: {', '.join(missing)}"
     
     # Validate userId (basic check for numeric string)
     if not isinstance(vehicle["userId"], str) or not vehicle["userId"].isdigit():
-        logger.warning(f"Invalid userId in vehicle: {vehicle['userId']}")
-        return False
+        return f"Invalid userId: {vehicle['userId']}"
     
     # Validate make, model, color (non-empty, max 20 chars)
     for field in ["make", "model", "color"]:
         if not isinstance(vehicle[field], str) or not vehicle[field] or len(vehicle[field]) > 20:
-            logger.warning(f"Invalid {field} in vehicle: {vehicle[field]}")
-            return False
+            return f"Invalid {field}: {vehicle[field]}"
     
     # No state validation: accept any state code
     
     # Validate plate (2–8 chars, alphanumeric or hyphen)
     plate = vehicle["plate"]
-    if not (2 <= len(plate) <= 8 and all(c.isalnum() or c == "-" for c in plate)):
-        logger.warning(f"Invalid plate in vehicle: {plate}")
-        return False
+    if not (isinstance(plate, str) and 2 <= len(plate) <= 8 and all(c.isalnum() or c == "-" for c in plate)):
+        return f"Invalid plate: {plate}"
     
     # Validate registeredAt (basic ISO format check)
     try:
         datetime.fromisoformat(vehicle["registeredAt"].replace("Z", "+00:00"))
-    except ValueError:
-        logger.warning(f"Invalid registeredAt in vehicle: {vehicle['registeredAt']}")
-        return False
+    except (AttributeError, ValueError):
+        return f"Invalid registeredAt: {vehicle['registeredAt']}"
     
+    return None
+
+def validate_vehicle(vehicle):
+    """Validate a vehicle entry against cog requirements, logging why it fails."""
+    error = vehicle_error(vehicle)
+    if error:
+        logger.warning(f"{error} in vehicle: {vehicle}")
+        return False
     return True
 
 def fix_json_file():
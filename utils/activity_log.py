@@ -0,0 +1,153 @@
+import bisect
+import json
+import os
+import time
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.datastore import DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# kind -> Font Awesome icon shown on the dashboard
+ACTIVITY_ICONS = {
+    "vehicle.registered": "fas fa-car",
+    "vehicle.transferred": "fas fa-exchange-alt",
+    "vehicle.updated": "fas fa-edit",
+    "vehicle.deleted": "fas fa-trash",
+    "vehicle.imported": "fas fa-file-import",
+    "session.created": "fas fa-gamepad",
+    "session.updated": "fas fa-gamepad",
+    "moderation.warning": "fas fa-exclamation-triangle",
+    "moderation.timeout": "fas fa-clock",
+    "moderation.timeout_removed": "fas fa-clock",
+    "moderation.timeout_expired": "fas fa-clock",
+    "moderation.kick": "fas fa-user-minus",
+    "moderation.ban": "fas fa-ban",
+    "economy.action": "fas fa-coins",
+    "economy.payment": "fas fa-coins",
+}
+
+
+class ActivityLog:
+    """Bounded, append-only log of things that happened, newest last.
+
+    Cogs call record() when an action happens. Entries are kept in memory
+    in timestamp order (so a time-range query is a bisect plus a walk over
+    the k results) and appended to data/activity.log; the file is compacted
+    to its newest ``max_entries`` lines once it grows to twice that size.
+    """
+
+    def __init__(self, path: Path = DATA_DIR / "activity.log", max_entries: Optional[int] = None, events=None):
+        self.path = Path(path)
+        if max_entries is None:
+            max_entries = int(os.getenv("ACTIVITY_LOG_SIZE", "1000"))
+        self.max_entries = max_entries
+        self.events = events
+        self._entries: List[Dict[str, Any]] = []
+        self._times: List[float] = []
+        self._file_lines = 0
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="activity-writer")
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        entries = []
+        with self.path.open("r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                self._file_lines += 1
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring unreadable entry at {self.path.name}:{line_no}")
+        entries.sort(key=lambda entry: entry["ts"])
+        self._entries = entries[-self.max_entries:]
+        self._times = [entry["ts"] for entry in self._entries]
+        logger.info(f"Loaded {len(self._entries)} activity entries")
+
+    def record(self, kind: str, text: str, actor_id=None, target_id=None, **details) -> Dict[str, Any]:
+        """Append an entry for something that just happened"""
+        now = time.time()
+        entry = {
+            "ts": now,
+            "timestamp": datetime.utcfromtimestamp(now).isoformat() + "Z",
+            "kind": kind,
+            "icon": ACTIVITY_ICONS.get(kind, "fas fa-info-circle"),
+            "text": text,
+            "actorId": str(actor_id) if actor_id is not None else None,
+            "targetId": str(target_id) if target_id is not None else None,
+        }
+        if details:
+            entry["details"] = details
+
+        if not self._times or now >= self._times[-1]:
+            self._entries.append(entry)
+            self._times.append(now)
+        else:
+            index = bisect.bisect_right(self._times, now)
+            self._entries.insert(index, entry)
+            self._times.insert(index, now)
+        # Trim in chunks so the list shift is amortized across many appends
+        if len(self._entries) > self.max_entries + self.max_entries // 4:
+            excess = len(self._entries) - self.max_entries
+            del self._entries[:excess]
+            del self._times[:excess]
+
+        self._writer.submit(self._append, entry)
+        if self.events is not None:
+            self.events.publish("activity.logged", entry)
+        return entry
+
+    def query(self, limit: int = 10, since: Optional[float] = None, until: Optional[float] = None,
+              kinds: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """Entries with since <= ts < until, newest first"""
+        kinds = set(kinds) if kinds else None
+        start = len(self._entries) if until is None else bisect.bisect_left(self._times, until)
+        results = []
+        for index in range(start - 1, -1, -1):
+            if len(results) >= limit:
+                break
+            entry = self._entries[index]
+            if since is not None and entry["ts"] < since:
+                break
+            if kinds is None or entry["kind"] in kinds:
+                results.append(entry)
+        return results
+
+    def _append(self, entry: Dict[str, Any]):
+        try:
+            self.path.parent.mkdir(exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self._file_lines += 1
+            if self._file_lines >= 2 * self.max_entries:
+                self._compact()
+        except Exception as e:
+            logger.error(f"Error writing activity log: {e}")
+
+    def _compact(self):
+        """Rewrite the file with its newest ``max_entries`` lines.
+
+        Works from what is already on disk rather than the in-memory window,
+        which can hold entries still queued for _append.
+        """
+        with self.path.open("r", encoding="utf-8") as f:
+            lines = deque(f, maxlen=self.max_entries)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            f.writelines(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file_lines = len(lines)
+
+    def close(self):
+        self._writer.shutdown(wait=True)
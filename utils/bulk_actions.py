@@ -0,0 +1,120 @@
+import asyncio
+import io
+import logging
+import os
+import re
+from collections import Counter
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 2.0  # seconds between progress edits of the followup
+REPORT_INLINE_LINES = 20  # longer reports are attached as a file
+MESSAGE_LIMIT = 2000
+
+# Outcome for one target: (status, detail); status is "ok", "skipped" or "failed"
+Result = Tuple[str, str]
+
+
+class SkipTarget(Exception):
+    """Raised by a bulk action for a target that needs no change"""
+
+
+def parse_ids(text: str) -> Tuple[List[int], List[str]]:
+    """IDs from a comma/whitespace separated list, deduplicated in order, and the tokens that aren't IDs"""
+    ids: List[int] = []
+    invalid: List[str] = []
+    seen = set()
+    for token in re.split(r"[\s,]+", text.strip()):
+        if not token:
+            continue
+        if not token.isdigit():
+            invalid.append(token)
+        elif int(token) not in seen:
+            seen.add(int(token))
+            ids.append(int(token))
+    return ids, invalid
+
+
+def describe_error(error: Exception) -> str:
+    if isinstance(error, discord.NotFound):
+        return "not found"
+    if isinstance(error, discord.Forbidden):
+        return "missing permissions"
+    if isinstance(error, discord.HTTPException):
+        return f"HTTP {error.status}: {error.text or 'request failed'}"
+    return str(error) or type(error).__name__
+
+
+class BulkAction:
+    """Applies an action to many user IDs with a bounded number in flight.
+
+    discord.py already waits out rate-limit buckets; the semaphore keeps a
+    long ID list from queueing hundreds of requests against one bucket at
+    once, while still overlapping round-trips instead of awaiting each ID
+    in turn. Every ID gets a result, so nothing fails silently.
+    """
+
+    def __init__(self, label: str, action: Callable[[int], Awaitable[Optional[str]]],
+                 concurrency: Optional[int] = None):
+        self.label = label
+        self.action = action
+        if concurrency is None:
+            concurrency = int(os.getenv("BULK_ACTION_CONCURRENCY", "5"))
+        self.concurrency = concurrency
+        self.results: Dict[int, Result] = {}
+
+    async def _apply(self, semaphore: asyncio.Semaphore, target_id: int):
+        async with semaphore:
+            try:
+                detail = await self.action(target_id)
+                self.results[target_id] = ("ok", detail or "")
+            except SkipTarget as e:
+                self.results[target_id] = ("skipped", str(e))
+            except Exception as e:
+                self.results[target_id] = ("failed", describe_error(e))
+
+    async def run(self, ids: List[int], on_progress: Optional[Callable[[int, int], Awaitable[None]]] = None) -> Dict[int, Result]:
+        """Run the action for every ID, calling ``on_progress(done, total)`` periodically"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        pending = {asyncio.ensure_future(self._apply(semaphore, target_id)) for target_id in ids}
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=PROGRESS_INTERVAL)
+            if pending and on_progress:
+                try:
+                    await on_progress(len(self.results), len(ids))
+                except discord.HTTPException as e:
+                    logger.warning(f"Could not update progress for {self.label}: {e}")
+        return {target_id: self.results[target_id] for target_id in ids}
+
+    def counts(self) -> Counter:
+        return Counter(status for status, _ in self.results.values())
+
+
+def format_report(results: Dict[int, Result], invalid: List[str]) -> List[str]:
+    lines = [f"{target_id}: {status}" + (f" ({detail})" if detail else "") for target_id, (status, detail) in results.items()]
+    lines += [f"{token}: failed (not a user ID)" for token in invalid]
+    return lines
+
+
+async def run_bulk_action(interaction: discord.Interaction, bulk: BulkAction, ids: List[int], invalid: List[str]):
+    """Run a bulk action for an admin portal modal, editing one followup with live progress and the final report"""
+    message = await interaction.followup.send(f"⏳ {bulk.label}: 0/{len(ids)}", ephemeral=True, wait=True)
+
+    async def progress(done: int, total: int):
+        await message.edit(content=f"⏳ {bulk.label}: {done}/{total}")
+
+    results = await bulk.run(ids, progress)
+    counts = bulk.counts()
+    summary = (f"✅ {bulk.label}: {counts['ok']} done, {counts['skipped']} skipped, "
+               f"{counts['failed'] + len(invalid)} failed")
+
+    lines = format_report(results, invalid)
+    inline = f"{summary}\n```\n" + "\n".join(lines) + "\n```" if lines else summary
+    if len(lines) <= REPORT_INLINE_LINES and len(inline) <= MESSAGE_LIMIT:
+        await message.edit(content=inline)
+    else:
+        report = discord.File(io.BytesIO("\n".join(lines).encode()), filename="bulk_report.txt")
+        await message.edit(content=f"{summary}\nPer-ID results are attached.", attachments=[report])
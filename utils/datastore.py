@@ -0,0 +1,624 @@
+import asyncio
+import contextlib
+import copy
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import logging
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(os.path.dirname(os.path.abspath(__file__))) / ".." / "data"
+
+# Collections whose writes are appended to a journal instead of rewriting
+# the whole file; the file itself is only rewritten at checkpoints.
+JOURNALED_COLLECTIONS = {"economy", "warnings"}
+
+
+def vehicle_key(vehicle: Dict[str, Any]) -> tuple:
+    """Vehicles are unique per (plate, state)"""
+    return (vehicle["plate"].upper(), vehicle["state"].upper())
+
+
+def record_id(record: Dict[str, Any]) -> int:
+    return record["id"]
+
+
+def record_user(record: Dict[str, Any]) -> str:
+    return str(record["user_id"])
+
+
+# name -> (file name, top-level JSON key, key function).
+# A key function of None means the collection is stored as a JSON object
+# keyed by id (economy), otherwise it is stored as a JSON list.
+COLLECTIONS = {
+    "vehicles": ("vehicles.json", "vehicles", vehicle_key),
+    "economy": ("economy.json", "users", None),
+    "sessions": ("sessions.json", "sessions", record_id),
+    "warnings": ("warnings.json", "data", record_id),
+    "timeouts": ("mutes.json", "data", record_user),
+}
+
+
+def assign_vehicle_id(vehicle: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> bool:
+    """Give a vehicle a stable id, keeping the one it had if it is being replaced"""
+    if vehicle.get("id"):
+        return False
+    vehicle["id"] = (previous or {}).get("id") or uuid.uuid4().hex
+    return True
+
+
+# name -> function(record, previous record) filling in fields every stored
+# record must have; returns True if it changed the record
+RECORD_DEFAULTS = {
+    "vehicles": assign_vehicle_id,
+}
+
+
+def vehicle_id(vehicle: Dict[str, Any]) -> Optional[str]:
+    return vehicle.get("id") or None
+
+
+def vehicle_plate(vehicle: Dict[str, Any]) -> str:
+    return vehicle["plate"].upper()
+
+
+def vehicle_owner(vehicle: Dict[str, Any]) -> Optional[str]:
+    return vehicle.get("userId") or None
+
+
+def warning_user(warning: Dict[str, Any]) -> Optional[str]:
+    user_id = warning.get("user_id")
+    return str(user_id) if user_id is not None else None
+
+
+# name -> {index name: function returning the indexed value of a record}
+INDEXES = {
+    "vehicles": {"id": vehicle_id, "plate": vehicle_plate, "owner": vehicle_owner},
+    "warnings": {"user": warning_user},
+}
+
+
+class SecondaryIndex:
+    """Maps an indexed value to the primary keys of the records that have it.
+
+    Kept up to date from the store's write notifications, so lookups by a
+    non-key field are a dict hit instead of a scan over the collection.
+    """
+
+    def __init__(self, value_func: Callable[[Dict[str, Any]], Hashable]):
+        self.value_func = value_func
+        # value -> {primary key: None}; a dict keeps insertion order
+        self._entries: Dict[Hashable, Dict[Hashable, None]] = {}
+
+    def _value(self, record: Optional[Dict[str, Any]]) -> Optional[Hashable]:
+        if record is None:
+            return None
+        try:
+            return self.value_func(record)
+        except (KeyError, AttributeError, TypeError):
+            return None
+
+    def __call__(self, key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        old_value, new_value = self._value(old), self._value(new)
+        if old_value == new_value and old is not None and new is not None:
+            return
+        if old_value is not None:
+            keys = self._entries.get(old_value)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self._entries[old_value]
+        if new_value is not None:
+            self._entries.setdefault(new_value, {})[key] = None
+
+    def clear(self):
+        self._entries.clear()
+
+    def keys_for(self, value: Hashable) -> List[Hashable]:
+        return list(self._entries.get(value, ()))
+
+    def count(self, value: Hashable) -> int:
+        return len(self._entries.get(value, ()))
+
+
+class JsonBackend:
+    """Stores each collection as a data/*.json file.
+
+    Files are replaced atomically (temp file + fsync + rename) so a crash
+    can never leave a truncated file behind. Journaled collections append
+    each change to ``<name>.journal`` and only rewrite the JSON file every
+    ``JOURNAL_CHECKPOINT_EVERY`` changes; the journal is replayed on load.
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, checkpoint_every: Optional[int] = None):
+        self.data_dir = Path(data_dir)
+        self.data_dir.mkdir(exist_ok=True)
+        # Read when the backend is built, after bot.py has loaded .env
+        if checkpoint_every is None:
+            checkpoint_every = int(os.getenv("JOURNAL_CHECKPOINT_EVERY", "200"))
+        self.checkpoint_every = checkpoint_every
+        self._journal_sizes: Dict[str, int] = {}
+        self._journaled_records: Dict[str, Dict[Hashable, Dict[str, Any]]] = {}
+
+    def _journal_path(self, name: str) -> Path:
+        return self.data_dir / f"{name}.journal"
+
+    def load(self, name: str) -> Dict[Hashable, Dict[str, Any]]:
+        filename, root, key_func = COLLECTIONS[name]
+        file_path = self.data_dir / filename
+        records: Dict[Hashable, Dict[str, Any]] = {}
+        rejected: List[Dict[str, Any]] = []
+
+        if file_path.exists():
+            try:
+                with file_path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except json.JSONDecodeError as e:
+                logger.error(f"Failed to parse {filename}: {e}")
+                self._quarantine(file_path)
+                data = {}
+
+            if not isinstance(data, dict):
+                logger.error(f"Invalid data format in {filename}, expected an object")
+                data = {}
+
+            if key_func is None:
+                for key, record in data.get(root, {}).items():
+                    records[str(key)] = record
+            else:
+                for record in data.get(root, []):
+                    try:
+                        key = key_func(record)
+                    except (KeyError, AttributeError, TypeError):
+                        rejected.append(record)
+                        continue
+                    if key in records:
+                        # Same key once normalized, e.g. abc/tx and ABC/TX
+                        rejected.append(records[key])
+                    records[key] = record
+            if rejected:
+                self._set_aside(file_path, rejected)
+
+        if name in JOURNALED_COLLECTIONS:
+            replayed = self._replay_journal(name, records)
+            if replayed:
+                logger.info(f"Replayed {replayed} journal entries into '{name}'")
+            # The backend's own copy, kept current from write() on the writer
+            # thread, so journal writes never need a snapshot of the collection
+            self._journaled_records[name] = dict(records)
+
+        # Fold any replayed entries into a fresh snapshot and start a new journal;
+        # rejected records are already saved aside, so drop them from the file now
+        if rejected or not file_path.exists() or self._journal_path(name).exists():
+            self._checkpoint(name, records)
+        return records
+
+    def needs_snapshot(self, name: str) -> bool:
+        """Plain JSON files are serialized from the whole collection on every write.
+        Journaled collections checkpoint from the backend's own copy instead."""
+        return name not in JOURNALED_COLLECTIONS
+
+    def write(self, name: str, upserts: List[tuple], deletes: List[Hashable], records: Optional[Dict[Hashable, Dict[str, Any]]]):
+        """Persist a batch of changes. ``records`` is a snapshot of the whole collection when needs_snapshot() is True."""
+        if name not in JOURNALED_COLLECTIONS:
+            self._dump(name, records)
+            return
+
+        records = self._journaled_records[name]
+        for key, record in upserts:
+            records[key] = record
+        for key in deletes:
+            records.pop(key, None)
+        entries = [{"op": "put", "key": key, "record": record} for key, record in upserts]
+        entries += [{"op": "delete", "key": key} for key in deletes]
+        with self._journal_path(name).open("a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._journal_sizes[name] = self._journal_sizes.get(name, 0) + len(entries)
+        if self._journal_sizes[name] >= self.checkpoint_every:
+            self._checkpoint(name, records)
+
+    def _replay_journal(self, name: str, records: Dict[Hashable, Dict[str, Any]]) -> int:
+        journal_path = self._journal_path(name)
+        if not journal_path.exists():
+            return 0
+
+        key_func = COLLECTIONS[name][2]
+        replayed = 0
+        with journal_path.open("r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Only the last line can be torn by a crash mid-append
+                    logger.warning(f"Ignoring incomplete entry at {journal_path.name}:{line_no}")
+                    break
+                key = entry["key"]
+                if entry["op"] == "put":
+                    record = entry["record"]
+                    records[key_func(record) if key_func else key] = record
+                elif entry["op"] == "delete":
+                    records.pop(tuple(key) if isinstance(key, list) else key, None)
+                replayed += 1
+        return replayed
+
+    def _checkpoint(self, name: str, records: Dict[Hashable, Dict[str, Any]]):
+        """Write a full snapshot, then drop the journal it supersedes"""
+        self._dump(name, records)
+        journal_path = self._journal_path(name)
+        if journal_path.exists():
+            journal_path.unlink()
+        self._journal_sizes[name] = 0
+
+    def _dump(self, name: str, records: Dict[Hashable, Dict[str, Any]]):
+        filename, root, key_func = COLLECTIONS[name]
+        if key_func is None:
+            data = {root: dict(records)}
+        else:
+            data = {root: list(records.values())}
+
+        file_path = self.data_dir / filename
+        tmp_path = file_path.with_suffix(file_path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+
+    def backup(self, name: str):
+        """Copy a collection's file aside before a one-time rewrite of every record"""
+        file_path = self.data_dir / COLLECTIONS[name][0]
+        if file_path.exists():
+            backup_path = file_path.with_name(f"{file_path.stem}_backup_{time.strftime('%Y%m%d_%H%M%S')}.json")
+            shutil.copy(file_path, backup_path)
+            logger.info(f"Backed up {file_path.name} as {backup_path.name}")
+
+    def _set_aside(self, file_path: Path, rejected: List[Dict[str, Any]]):
+        """Save records that can't be loaded (no key, or a duplicate key) to <name>.rejected.json"""
+        rejected_path = file_path.with_name(f"{file_path.stem}.rejected.json")
+        try:
+            previous = []
+            if rejected_path.exists():
+                with rejected_path.open("r", encoding="utf-8") as f:
+                    previous = json.load(f)
+            tmp_path = rejected_path.with_suffix(rejected_path.suffix + ".tmp")
+            with tmp_path.open("w", encoding="utf-8") as f:
+                json.dump(previous + rejected, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, rejected_path)
+        except (OSError, ValueError) as e:
+            # Never rewrite the file without keeping these somewhere
+            logger.error(f"Could not save rejected records to {rejected_path.name}: {e}")
+            self._quarantine(file_path)
+            return
+        logger.warning(f"Moved {len(rejected)} malformed or duplicate records from {file_path.name} to {rejected_path.name}")
+
+    def _quarantine(self, file_path: Path):
+        """Keep a copy of a file that can't be fully loaded instead of overwriting it"""
+        corrupt_path = file_path.with_suffix(f".corrupt-{int(time.time())}")
+        try:
+            shutil.copy(file_path, corrupt_path)
+            logger.error(f"Saved a copy of {file_path.name} as {corrupt_path.name}")
+        except OSError as e:
+            logger.error(f"Could not back up unreadable {file_path.name}: {e}")
+
+    def close(self):
+        for name, records in self._journaled_records.items():
+            try:
+                self._checkpoint(name, records)
+            except Exception as e:
+                logger.error(f"Error checkpointing '{name}' on close: {e}")
+
+
+def create_backend(kind: Optional[str] = None, data_dir: Path = DATA_DIR):
+    """Build the storage backend selected by the STORAGE_BACKEND env var"""
+    kind = (kind or os.getenv("STORAGE_BACKEND", "json")).lower()
+    if kind == "sqlite":
+        from utils.sqlite_backend import SqliteBackend
+        return SqliteBackend()
+    if kind != "json":
+        logger.warning(f"Unknown STORAGE_BACKEND '{kind}', falling back to json")
+    return JsonBackend(data_dir)
+
+
+class DataStore:
+    """Bot-wide in-memory cache of the vehicle, economy, session and warning data.
+
+    Each collection is loaded from disk once and kept as an ordered
+    ``key -> record`` dict. Reads are served from memory and every write
+    goes through ``put``/``delete`` so the backend (JSON files or SQLite)
+    stays in sync.
+
+    ``get`` hands out a copy that callers may modify and pass back to
+    ``put``. ``all`` returns the live records and must be treated as
+    read-only.
+
+    Individual calls are thread-safe. A read-modify-write that awaits in
+    between (or runs on another thread) must hold ``locked(name, key)``.
+
+    Persistence never runs on the caller's thread: memory is updated
+    immediately and the backend write is queued on a single writer thread,
+    so the event loop never blocks on disk and writes stay in order.
+    ``flush`` waits for everything queued so far.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or create_backend()
+        self._collections: Dict[str, Dict[Hashable, Dict[str, Any]]] = {}
+        self._listeners: Dict[str, List[Callable]] = {name: [] for name in COLLECTIONS}
+        self._indexes: Dict[str, Dict[str, SecondaryIndex]] = {
+            name: {index: SecondaryIndex(func) for index, func in INDEXES.get(name, {}).items()}
+            for name in COLLECTIONS
+        }
+        self._mutex = threading.RLock()
+        self._locks: Dict[tuple, list] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="datastore-writer")
+        # Bumped on every write, so callers can tell whether a collection changed.
+        # The instance id keeps versions from different runs from colliding.
+        self.instance_id = uuid.uuid4().hex[:8]
+        self._generations: Dict[str, int] = {name: 0 for name in COLLECTIONS}
+        # Next id for id-keyed collections, seeded on load so next_id() needn't scan
+        self._next_ids: Dict[str, int] = {}
+
+    def load_all(self):
+        """Load every collection from the backend"""
+        with self._mutex:
+            for name in COLLECTIONS:
+                self._load(name)
+                logger.info(f"Loaded {len(self._collections[name])} records into '{name}'")
+
+    def _load(self, name: str):
+        records = self.backend.load(name)
+        self._collections[name] = records
+        self._generations[name] += 1
+        if COLLECTIONS[name][2] is record_id:
+            self._next_ids[name] = max(records, default=0) + 1
+        fill = RECORD_DEFAULTS.get(name)
+        if fill is not None:
+            # Records written before a field was introduced get it now
+            filled = [(key, record) for key, record in records.items() if fill(record, None)]
+            if filled:
+                logger.info(f"Filled in missing fields on {len(filled)} '{name}' records")
+                # Keep the data as it was before this one-time rewrite
+                self.backend.backup(name)
+                self._persist(name, upserts=filled)
+        for index in self._indexes[name].values():
+            index.clear()
+            for key, record in records.items():
+                index(key, None, record)
+
+    def _records(self, name: str) -> Dict[Hashable, Dict[str, Any]]:
+        if name not in self._collections:
+            self._load(name)
+        return self._collections[name]
+
+    def key_for(self, name: str, record: Dict[str, Any]) -> Hashable:
+        """Return the primary key of a record in the given collection"""
+        key_func = COLLECTIONS[name][2]
+        if key_func is None:
+            raise ValueError(f"Collection '{name}' needs an explicit key")
+        return key_func(record)
+
+    @contextlib.asynccontextmanager
+    async def _record_lock(self, name: str, key: Hashable):
+        # [lock, holders + waiters]; the entry is dropped once nobody uses it,
+        # so the table doesn't grow with every key ever locked
+        with self._mutex:
+            entry = self._locks.get((name, key))
+            if entry is None:
+                entry = self._locks[(name, key)] = [asyncio.Lock(), 0]
+            entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            with self._mutex:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._locks[(name, key)]
+
+    @contextlib.asynccontextmanager
+    async def locked(self, name: str, *keys: Hashable):
+        """Hold the locks for one or more records at once.
+
+        Locks are always taken in sorted order so two commands touching
+        the same pair of users (e.g. /pay in both directions) cannot deadlock.
+        """
+        if not keys:
+            raise ValueError("locked() needs at least one record key")
+        async with contextlib.AsyncExitStack() as stack:
+            for key in sorted(set(keys), key=str):
+                await stack.enter_async_context(self._record_lock(name, key))
+            yield
+
+    def key_by(self, name: str, index: str, value: Hashable) -> Optional[Hashable]:
+        """Primary key of the first record whose indexed field equals value"""
+        with self._mutex:
+            self._records(name)
+            keys = self._indexes[name][index].keys_for(value)
+            return keys[0] if keys else None
+
+    def find(self, name: str, index: str, value: Hashable) -> List[Dict[str, Any]]:
+        """Records whose indexed field equals value, in insertion order (read-only)"""
+        with self._mutex:
+            records = self._records(name)
+            return [records[key] for key in self._indexes[name][index].keys_for(value)]
+
+    def count_by(self, name: str, index: str, value: Hashable) -> int:
+        with self._mutex:
+            self._records(name)
+            return self._indexes[name][index].count(value)
+
+    def all(self, name: str) -> List[Dict[str, Any]]:
+        """Return every record of a collection in insertion order"""
+        with self._mutex:
+            return list(self._records(name).values())
+
+    def items(self, name: str) -> List[tuple]:
+        with self._mutex:
+            return list(self._records(name).items())
+
+    def get(self, name: str, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._mutex:
+            record = self._records(name).get(key)
+            return copy.deepcopy(record) if record is not None else None
+
+    def get_many(self, name: str, keys: List[Hashable]) -> List[Dict[str, Any]]:
+        """Live records for the given keys, skipping missing ones (read-only)"""
+        with self._mutex:
+            records = self._records(name)
+            return [records[key] for key in keys if key in records]
+
+    def exists(self, name: str, key: Hashable) -> bool:
+        with self._mutex:
+            return key in self._records(name)
+
+    def count(self, name: str) -> int:
+        with self._mutex:
+            return len(self._records(name))
+
+    def next_id(self, name: str) -> int:
+        """Reserve the next free integer id for id-keyed collections (sessions, warnings)"""
+        with self._mutex:
+            self._records(name)
+            next_id = self._next_ids[name]
+            self._next_ids[name] = next_id + 1
+            return next_id
+
+    def _stored_copy(self, name: str, record: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        stored = copy.deepcopy(record)
+        fill = RECORD_DEFAULTS.get(name)
+        if fill is not None:
+            fill(stored, previous)
+        return stored
+
+    def put(self, name: str, record: Dict[str, Any], key: Optional[Hashable] = None) -> Dict[str, Any]:
+        """Insert or replace a record and persist the collection. Returns a copy of the stored record."""
+        if key is None:
+            key = self.key_for(name, record)
+        with self._mutex:
+            records = self._records(name)
+            old = records.get(key)
+            records[key] = self._stored_copy(name, record, old)
+            self._persist(name, upserts=[(key, records[key])])
+            self._notify(name, key, old, records[key])
+            return copy.deepcopy(records[key])
+
+    def replace(self, name: str, old_key: Hashable, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Store a record under its own key in place of the one at ``old_key``, as one write.
+
+        Used when an edit changes a record's key (e.g. a vehicle's plate).
+        Returns a copy of the stored record.
+        """
+        key = self.key_for(name, record)
+        if key == old_key:
+            return self.put(name, record, key)
+        with self._mutex:
+            records = self._records(name)
+            old = records.pop(old_key, None)
+            displaced = records.get(key)
+            records[key] = self._stored_copy(name, record, old)
+            self._persist(name, upserts=[(key, records[key])], deletes=[old_key] if old is not None else None)
+            if old is not None:
+                self._notify(name, old_key, old, None)
+            self._notify(name, key, displaced, records[key])
+            return copy.deepcopy(records[key])
+
+    def put_many(self, name: str, records: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace several records with a single write. Returns how many were stored."""
+        with self._mutex:
+            stored = self._records(name)
+            changes = []
+            for record in records:
+                key = self.key_for(name, record)
+                changes.append((key, stored.get(key)))
+                stored[key] = self._stored_copy(name, record, stored.get(key))
+            if not changes:
+                return 0
+            self._persist(name, upserts=[(key, stored[key]) for key, _ in changes])
+            for key, old in changes:
+                self._notify(name, key, old, stored[key])
+        return len(changes)
+
+    def delete(self, name: str, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Remove a record and persist the collection. Returns the removed record."""
+        with self._mutex:
+            records = self._records(name)
+            old = records.pop(key, None)
+            if old is not None:
+                self._persist(name, deletes=[key])
+                self._notify(name, key, old, None)
+        return old
+
+    def delete_many(self, name: str, keys: List[Hashable]) -> int:
+        """Remove several records with a single persist. Returns how many were removed."""
+        with self._mutex:
+            records = self._records(name)
+            removed = [(key, records.pop(key)) for key in keys if key in records]
+            if removed:
+                self._persist(name, deletes=[key for key, _ in removed])
+                for key, old in removed:
+                    self._notify(name, key, old, None)
+        return len(removed)
+
+    def subscribe(self, name: str, callback: Callable, replay: bool = False):
+        """Register ``callback(key, old, new)`` to run after every write to a collection.
+
+        With ``replay`` the callback is first fed every existing record as an
+        insert, which lets aggregates build their initial state.
+        """
+        with self._mutex:
+            if replay:
+                for key, record in self._records(name).items():
+                    callback(key, None, record)
+            self._listeners[name].append(callback)
+
+    def generation(self, name: str) -> int:
+        """Counter that changes whenever the collection is written"""
+        return self._generations[name]
+
+    def _notify(self, name: str, key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        self._generations[name] += 1
+        if name in self._next_ids and new is not None and key >= self._next_ids[name]:
+            # Stored under an explicit id, e.g. by a migration
+            self._next_ids[name] = key + 1
+        for index in self._indexes[name].values():
+            index(key, old, new)
+        for callback in self._listeners[name]:
+            try:
+                callback(key, old, new)
+            except Exception as e:
+                logger.error(f"Error in '{name}' listener {callback!r}: {e}")
+
+    def _persist(self, name: str, upserts: Optional[List[tuple]] = None, deletes: Optional[List[Hashable]] = None):
+        # Records are replaced, never mutated in place, so a shallow copy is
+        # a consistent snapshot for the writer thread to serialize.
+        snapshot = dict(self._records(name)) if self.backend.needs_snapshot(name) else None
+        self._writer.submit(self._write, name, upserts or [], deletes or [], snapshot)
+
+    def _write(self, name: str, upserts: List[tuple], deletes: List[Hashable], snapshot):
+        try:
+            self.backend.write(name, upserts, deletes, snapshot)
+        except Exception as e:
+            logger.error(f"Error saving '{name}': {e}")
+
+    async def flush(self):
+        """Wait until every queued write has reached the backend"""
+        await asyncio.get_running_loop().run_in_executor(self._writer, lambda: None)
+
+    def close(self):
+        """Finish queued writes and close the backend"""
+        self._writer.shutdown(wait=True)
+        with self._mutex:
+            self.backend.close()
@@ -0,0 +1,130 @@
+import asyncio
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+
+def _vehicle_event(key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    record = new if new is not None else old
+    kind = "vehicle.registered" if old is None else "vehicle.deleted" if new is None else "vehicle.updated"
+    return kind, {
+        'id': record.get('id'),
+        'plate': record.get('plate'),
+        'state': record.get('state'),
+        'userId': record.get('userId'),
+        'make': record.get('make'),
+        'model': record.get('model'),
+    }
+
+
+def _economy_event(key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    record = new or {}
+    return "economy.balance_changed", {
+        'userId': str(key),
+        'balance': record.get('balance', 0),
+        'bank': record.get('bank', 0),
+    }
+
+
+def _session_event(key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    record = new if new is not None else old
+    kind = "session.created" if old is None else "session.deleted" if new is None else "session.updated"
+    return kind, {
+        'id': key,
+        'status': record.get('status'),
+        'hostId': record.get('host_id'),
+    }
+
+
+def _warning_event(key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    record = new if new is not None else old
+    kind = "warning.issued" if old is None else "warning.removed" if new is None else "warning.updated"
+    return kind, {
+        'id': key,
+        'userId': record.get('user_id'),
+        'moderatorId': record.get('moderator_id'),
+    }
+
+
+def _timeout_event(key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+    record = new if new is not None else old
+    kind = "timeout.issued" if old is None else "timeout.removed" if new is None else "timeout.updated"
+    return kind, {
+        'userId': key,
+        'moderatorId': record.get('moderator_id'),
+        'expiresAt': record.get('expires_at'),
+    }
+
+
+# collection -> function turning a store change into (event type, payload)
+STORE_EVENTS: Dict[str, Callable] = {
+    "vehicles": _vehicle_event,
+    "economy": _economy_event,
+    "sessions": _session_event,
+    "warnings": _warning_event,
+    "timeouts": _timeout_event,
+}
+
+
+class EventHub:
+    """Fans change events out to live dashboard connections.
+
+    Store writes are turned into events automatically; cogs can also call
+    publish() for things that aren't store writes. Each subscriber gets a
+    bounded queue; when it fills up (a bulk import, or a reader that stopped
+    reading) the backlog is replaced by a single ``stream.resync`` event
+    telling the dashboard to reload, so memory stays bounded without
+    disconnecting anyone.
+    """
+
+    def __init__(self, store=None, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        if store is not None:
+            for name, to_event in STORE_EVENTS.items():
+                store.subscribe(name, self._store_listener(to_event))
+
+    def _store_listener(self, to_event: Callable):
+        def listener(key, old, new):
+            if not self._subscribers:
+                return
+            kind, data = to_event(key, old, new)
+            self.publish(kind, data)
+        return listener
+
+    def subscribe(self) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self._subscribers.discard(queue)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, kind: str, data: Dict[str, Any]):
+        """Queue an event for every subscriber (safe to call from any thread)"""
+        if not self._subscribers or self._loop is None:
+            return
+        event = {'type': kind, 'data': data, 'timestamp': datetime.utcnow().isoformat() + 'Z'}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._deliver(event)
+        else:
+            self._loop.call_soon_threadsafe(self._deliver, event)
+
+    def _deliver(self, event: Dict[str, Any]):
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Too many changes to replay one by one; a reload covers them all
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({'type': 'stream.resync', 'data': {}, 'timestamp': event['timestamp']})
@@ -0,0 +1,81 @@
+import bisect
+import logging
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def total_wealth(user_data: Dict[str, Any]) -> int:
+    return user_data.get("balance", 0) + user_data.get("bank", 0)
+
+
+class WealthLeaderboard:
+    """Economy accounts ranked by total wealth (balance + bank).
+
+    Subscribed to the economy collection, so every balance change moves
+    one entry instead of re-sorting all users. The ranking is a sorted list
+    of (-wealth, user_id): lookups are a bisect, and ties are broken by
+    user id so ranks are stable.
+    """
+
+    def __init__(self, store):
+        self._ranking: List[Tuple[int, str]] = []
+        self._wealth: Dict[str, int] = {}
+        self.total_money = 0
+        store.subscribe("economy", self._on_change, replay=True)
+        logger.info(f"Leaderboard ready ({len(self._ranking)} accounts)")
+
+    def __len__(self) -> int:
+        return len(self._ranking)
+
+    def _on_change(self, key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        user_id = str(key)
+        previous = self._wealth.pop(user_id, None)
+        if previous is not None:
+            index = bisect.bisect_left(self._ranking, (-previous, user_id))
+            if index < len(self._ranking) and self._ranking[index] == (-previous, user_id):
+                del self._ranking[index]
+            self.total_money -= previous
+        if new is not None:
+            wealth = total_wealth(new)
+            self._wealth[user_id] = wealth
+            bisect.insort(self._ranking, (-wealth, user_id))
+            self.total_money += wealth
+
+    def wealth(self, user_id: str) -> Optional[int]:
+        return self._wealth.get(str(user_id))
+
+    def rank(self, user_id: str) -> Optional[int]:
+        """1-based position of a user, or None if they have no account"""
+        user_id = str(user_id)
+        wealth = self._wealth.get(user_id)
+        if wealth is None:
+            return None
+        return bisect.bisect_left(self._ranking, (-wealth, user_id)) + 1
+
+    def position(self, wealth: int, user_id: str) -> int:
+        """Index at which (wealth, user_id) is or would be ranked; used for paging"""
+        return bisect.bisect_left(self._ranking, (-wealth, str(user_id)))
+
+    def position_after(self, wealth: int, user_id: str) -> int:
+        """Index of the first entry ranked below (wealth, user_id)"""
+        return bisect.bisect_right(self._ranking, (-wealth, str(user_id)))
+
+    def count_at_least(self, wealth: int) -> int:
+        """Number of accounts worth ``wealth`` or more"""
+        return bisect.bisect_left(self._ranking, (-wealth + 1,))
+
+    def ranked(self, start: int = 0, reverse: bool = False) -> Iterator[Tuple[str, int]]:
+        """(user_id, wealth) from richest to poorest beginning at position ``start``,
+        or from ``start`` back up towards the richest if ``reverse`` is set"""
+        # Walk by position rather than copying the whole ranking; callers
+        # typically stop after the first few entries.
+        indexes = range(start, -1, -1) if reverse else range(start, len(self._ranking))
+        for index in indexes:
+            if index >= len(self._ranking):
+                continue
+            negative_wealth, user_id = self._ranking[index]
+            yield user_id, -negative_wealth
+
+    def top(self, limit: int = 10) -> List[Tuple[str, int]]:
+        return [(user_id, -negative_wealth) for negative_wealth, user_id in self._ranking[:limit]]
@@ -0,0 +1,94 @@
+import logging
+from typing import Dict, Iterable, Optional, Tuple
+
+import discord
+
+logger = logging.getLogger(__name__)
+
+# (display name, avatar URL or None)
+Profile = Tuple[str, Optional[str]]
+
+
+def member_profile(member: discord.Member) -> Profile:
+    return member.display_name, str(member.avatar.url) if member.avatar else None
+
+
+class MemberProfileCache:
+    """Display name and avatar URL per member of the main guild.
+
+    Filled from the guild's member list when it becomes available and kept
+    current from member join/update/remove events, so the web API can
+    enrich rows with a dict lookup instead of resolving members per row.
+    """
+
+    def __init__(self, bot, guild_id: int):
+        self.bot = bot
+        self.guild_id = guild_id
+        self._profiles: Dict[int, Profile] = {}
+        # Bumped whenever a cached profile changes (used for response caching)
+        self.version = 0
+        bot.add_listener(self._on_guild_available, 'on_guild_available')
+        bot.add_listener(self._on_member_join, 'on_member_join')
+        bot.add_listener(self._on_member_update, 'on_member_update')
+        bot.add_listener(self._on_member_remove, 'on_member_remove')
+        bot.add_listener(self._on_user_update, 'on_user_update')
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def prime(self, guild: discord.Guild):
+        self._profiles = {member.id: member_profile(member) for member in guild.members}
+        self.version += 1
+        logger.info(f"Cached profiles for {len(self._profiles)} members")
+
+    def _set(self, user_id: int, profile: Profile):
+        if self._profiles.get(user_id) != profile:
+            self._profiles[user_id] = profile
+            self.version += 1
+
+    async def _on_guild_available(self, guild: discord.Guild):
+        if guild.id == self.guild_id:
+            self.prime(guild)
+
+    async def _on_member_join(self, member: discord.Member):
+        if member.guild.id == self.guild_id:
+            self._set(member.id, member_profile(member))
+
+    async def _on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.guild.id == self.guild_id:
+            self._set(after.id, member_profile(after))
+
+    async def _on_member_remove(self, member: discord.Member):
+        if member.guild.id == self.guild_id and self._profiles.pop(member.id, None) is not None:
+            self.version += 1
+
+    async def _on_user_update(self, before: discord.User, after: discord.User):
+        # Username / avatar changes arrive as user updates, not member updates
+        if after.id in self._profiles:
+            guild = self.bot.get_guild(self.guild_id)
+            member = guild.get_member(after.id) if guild else None
+            if member:
+                self._set(after.id, member_profile(member))
+
+    def get(self, user_id) -> Optional[Profile]:
+        """Profile of a current member, or None if the id isn't in the guild"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+        profile = self._profiles.get(user_id)
+        if profile is None:
+            # Members that joined before the cache was primed
+            guild = self.bot.get_guild(self.guild_id)
+            member = guild.get_member(user_id) if guild else None
+            if member:
+                profile = self._profiles[user_id] = member_profile(member)
+        return profile
+
+    def lookup(self, user_id, placeholder: str = "User") -> Profile:
+        """Profile for a user id, with a placeholder name like "User#123" if unknown"""
+        return self.get(user_id) or (f"{placeholder}#{user_id}", None)
+
+    def lookup_many(self, user_ids: Iterable, placeholder: str = "User") -> Dict[str, Profile]:
+        """Profiles for several ids at once, keyed by the id as a string"""
+        return {str(user_id): self.lookup(user_id, placeholder) for user_id in set(user_ids) if user_id}
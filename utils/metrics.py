@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+import psutil
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from a fixed sleep.
+
+    Anything that blocks the loop (disk I/O, heavy CPU work in a command)
+    shows up directly as lag, so this is the number to watch before and
+    after moving work off the loop.
+    """
+
+    def __init__(self, interval: float = 0.5, history: int = 240):
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self.max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - started - self.interval)
+            self.samples.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+            if lag > 1:
+                logger.warning(f"Event loop was blocked for {lag:.2f}s")
+
+    def percentile(self, pct: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+    def snapshot(self) -> Dict[str, float]:
+        """Lag in milliseconds over the recent window"""
+        return {
+            'current': round((self.samples[-1] if self.samples else 0.0) * 1000, 2),
+            'p50': round(self.percentile(50) * 1000, 2),
+            'p99': round(self.percentile(99) * 1000, 2),
+            'max': round(self.max_lag * 1000, 2),
+        }
+
+
+class SystemMetricsSampler:
+    """Samples CPU, memory and event loop lag in the background.
+
+    Readers get the latest sample (and a short history for charts) without
+    waiting: CPU is measured as usage since the previous sample rather than
+    with a blocking psutil interval.
+    """
+
+    def __init__(self, loop_monitor: Optional[LoopLagMonitor] = None, interval: float = 5.0, history: int = 120):
+        self.loop_monitor = loop_monitor
+        self.interval = interval
+        self.samples = deque(maxlen=history)
+        self.process = psutil.Process(os.getpid())
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            # Prime the counters so the first real sample covers one interval
+            psutil.cpu_percent(interval=None)
+            self.process.cpu_percent(interval=None)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.samples.append(self.sample())
+            except Exception as e:
+                logger.error(f"Error sampling system metrics: {e}")
+
+    def sample(self) -> Dict[str, Any]:
+        memory = psutil.virtual_memory()
+        lag = self.loop_monitor.snapshot() if self.loop_monitor else None
+        return {
+            'timestamp': time.time(),
+            'cpu': psutil.cpu_percent(interval=None),
+            'processCpu': self.process.cpu_percent(interval=None),
+            'memory': memory.percent,
+            'memoryUsedMb': memory.used // 1024 // 1024,
+            'processMemoryMb': round(self.process.memory_info().rss / 1024 / 1024, 2),
+            'loopLagMs': lag['current'] if lag else None,
+        }
+
+    def latest(self) -> Dict[str, Any]:
+        """Most recent sample, taking one now if the sampler hasn't run yet"""
+        if not self.samples:
+            self.samples.append(self.sample())
+        return self.samples[-1]
+
+    def history(self) -> List[Dict[str, Any]]:
+        return list(self.samples)
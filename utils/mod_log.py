@@ -0,0 +1,118 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+import discord
+from asyncio_throttle import Throttler
+
+logger = logging.getLogger(__name__)
+
+# Discord limits for a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+
+def moderation_embed(action: str, moderator: discord.abc.User, target: discord.abc.Snowflake,
+                     reason: Optional[str], duration: Optional[str] = None) -> discord.Embed:
+    """The mod log entry for one moderation action (target may be a bare discord.Object)"""
+    embed = discord.Embed(
+        title=f"🛡️ Moderation Action: {action}",
+        color=0xff6b6b,
+        timestamp=datetime.utcnow()
+    )
+
+    embed.add_field(name="Target", value=f"<@{target.id}> ({target.id})", inline=True)
+    embed.add_field(name="Moderator", value=f"{moderator.mention} ({moderator.id})", inline=True)
+    embed.add_field(name="Reason", value=reason or "No reason provided", inline=False)
+
+    if duration:
+        embed.add_field(name="Duration", value=duration, inline=True)
+
+    if hasattr(target, "default_avatar"):
+        embed.set_thumbnail(url=target.avatar.url if target.avatar else target.default_avatar.url)
+    embed.set_footer(text="MGVRP Moderation System")
+    return embed
+
+
+class ModLogSink:
+    """Queued writer for the moderation log channel.
+
+    Callers enqueue embeds with send() and return immediately. A background
+    task gathers whatever arrives within ``linger`` seconds into messages of
+    up to 10 embeds and sends them through a throttler matching Discord's
+    per-channel message limit (5 per 5 seconds), so a burst of actions
+    becomes a few messages instead of a run of 429s.
+    """
+
+    def __init__(self, bot, channel_id: int, linger: float = 1.0, rate_limit: int = 5, period: float = 5.0):
+        self.bot = bot
+        self.channel_id = channel_id
+        self.linger = linger
+        self.rate_limit = rate_limit
+        self.period = period
+        # Created in start() so they belong to the bot's running loop
+        self._queue: Optional[asyncio.Queue] = None
+        self._throttler: Optional[Throttler] = None
+        self._backlog: List[discord.Embed] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def send(self, embed: discord.Embed):
+        """Queue an embed for the log channel"""
+        if self._queue is None:
+            self._backlog.append(embed)  # Sent once start() runs
+        else:
+            self._queue.put_nowait(embed)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else len(self._backlog)
+
+    def start(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._throttler = Throttler(rate_limit=self.rate_limit, period=self.period)
+            for embed in self._backlog:
+                self._queue.put_nowait(embed)
+            self._backlog.clear()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        carried: Optional[discord.Embed] = None
+        while True:
+            batch = [carried or await self._queue.get()]
+            carried = None
+            size = len(batch[0])
+            deadline = asyncio.get_running_loop().time() + self.linger
+            while len(batch) < MAX_EMBEDS_PER_MESSAGE:
+                remaining = deadline - asyncio.get_running_loop().time()
+                try:
+                    if remaining > 0:
+                        embed = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    else:
+                        # Past the linger window: take only what is already queued
+                        embed = self._queue.get_nowait()
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+                if size + len(embed) > MAX_EMBED_CHARS_PER_MESSAGE:
+                    carried = embed  # Starts the next message
+                    break
+                batch.append(embed)
+                size += len(embed)
+            await self._deliver(batch)
+
+    async def _deliver(self, embeds: List[discord.Embed]):
+        channel = self.bot.get_channel(self.channel_id)
+        if channel is None:
+            logger.warning(f"Mod log channel {self.channel_id} not found, dropping {len(embeds)} entries")
+            return
+        async with self._throttler:
+            try:
+                await channel.send(embeds=embeds)
+            except discord.HTTPException as e:
+                logger.error(f"Error sending {len(embeds)} entries to the mod log: {e}")
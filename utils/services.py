@@ -0,0 +1,66 @@
+import os
+import logging
+
+from utils.datastore import DataStore
+from utils.metrics import LoopLagMonitor, SystemMetricsSampler
+from utils.vehicle_search import VehicleSearchIndex
+from utils.vehicle_stats import VehicleStats
+from utils.session_stats import SessionStats
+from utils.leaderboard import WealthLeaderboard
+from utils.events import EventHub
+from utils.member_cache import MemberProfileCache
+from utils.activity_log import ActivityLog
+from utils.timeouts import TimeoutLedger
+from utils.mod_log import ModLogSink
+
+logger = logging.getLogger(__name__)
+
+
+def attach_services(bot):
+    """Create the shared services the cogs and web server rely on and attach them to the bot.
+
+    Used by bot.py and deploy_commands.py so every extension loads the same
+    way in both.
+    """
+    # Shared data store used by the cogs and the web server
+    bot.datastore = DataStore()
+    bot.datastore.load_all()
+
+    # Kept in sync with the vehicles collection; used by /vehicle_search
+    bot.vehicle_search = VehicleSearchIndex(bot.datastore)
+
+    # Counters by state, make, color and registration day (/vehicle_stats, /api/stats)
+    bot.vehicle_stats = VehicleStats(bot.datastore)
+
+    # Counters by status, host, day and week (/session_stats, /api/stats)
+    bot.session_stats = SessionStats(bot.datastore)
+
+    # Economy accounts ranked by wealth (/leaderboard, /api/economy)
+    bot.leaderboard = WealthLeaderboard(bot.datastore)
+
+    # Live change events for the dashboard (/api/events)
+    bot.events = EventHub(bot.datastore)
+
+    # Display names / avatars for the web API, kept fresh from member events
+    bot.member_cache = MemberProfileCache(bot, int(os.getenv('GUILD_ID', '1277047315047120978')))
+
+    # Append-only feed of registrations, sessions, moderation and economy actions
+    bot.activity = ActivityLog(events=bot.events)
+
+    # Active member timeouts; expiries are dispatched as on_timeout_expire
+    bot.timeouts = TimeoutLedger(bot.datastore, on_expire=lambda record: bot.dispatch('timeout_expire', record))
+
+    # Batched, rate-limited writer for the moderation log channel
+    bot.mod_log = ModLogSink(bot, int(os.getenv('MOD_LOG_CHANNEL', '1339764330425487460')))
+
+    # Tracks how long the event loop is blocked (see !health and /botstats)
+    bot.loop_monitor = LoopLagMonitor()
+
+    # CPU / memory / lag samples for /api/stats and the admin portal
+    bot.system_metrics = SystemMetricsSampler(bot.loop_monitor)
+
+
+def close_services(bot):
+    """Finish queued activity and data writes once the bot has stopped"""
+    bot.activity.close()
+    bot.datastore.close()
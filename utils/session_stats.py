@@ -0,0 +1,95 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def session_created(session: Dict[str, Any]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(session['created_at'])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def week_label(day) -> str:
+    """ISO week of a date, e.g. 2024-W07"""
+    year, week, _ = day.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class SessionStats:
+    """Session counters maintained on every write to the sessions collection.
+
+    Counts by status and host plus sessions per creation day and ISO week,
+    so /session_stats and /api/stats read totals over the whole history
+    instead of scanning every session on each call.
+    """
+
+    def __init__(self, store):
+        self.total = 0
+        self.by_status: Counter = Counter()
+        self.by_host: Counter = Counter()
+        self.by_day: Counter = Counter()
+        self.by_week: Counter = Counter()
+        store.subscribe("sessions", self._on_change, replay=True)
+        logger.info(f"Session statistics ready ({self.total} sessions)")
+
+    @staticmethod
+    def _labels(session: Dict[str, Any]) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+        created = session_created(session)
+        return (
+            session.get('status', 'Unknown'),
+            session.get('host_id'),
+            created.date().isoformat() if created else None,
+            week_label(created.date()) if created else None,
+        )
+
+    def _apply(self, session: Dict[str, Any], delta: int):
+        self.total += delta
+        for counter, label in zip((self.by_status, self.by_host, self.by_day, self.by_week), self._labels(session)):
+            if label is None:
+                continue
+            counter[label] += delta
+            if counter[label] <= 0:
+                del counter[label]
+
+    def _on_change(self, key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        if old is not None:
+            self._apply(old, -1)
+        if new is not None:
+            self._apply(new, 1)
+
+    @property
+    def ended(self) -> int:
+        return self.by_status.get('Ended', 0)
+
+    @property
+    def active(self) -> int:
+        return self.total - self.ended
+
+    def recent(self, days: int = 7) -> int:
+        """Sessions created within the last ``days`` days (by calendar day)"""
+        today = datetime.utcnow().date()
+        return sum(self.by_day.get((today - timedelta(days=offset)).isoformat(), 0) for offset in range(days))
+
+    def weekly(self, weeks: int = 4) -> List[Tuple[str, int]]:
+        """(ISO week, sessions created) for the last ``weeks`` weeks, oldest first"""
+        today = datetime.utcnow().date()
+        labels = [week_label(today - timedelta(weeks=offset)) for offset in range(weeks - 1, -1, -1)]
+        return [(label, self.by_week.get(label, 0)) for label in labels]
+
+    def top_hosts(self, limit: int = 5) -> List[Tuple[str, int]]:
+        return self.by_host.most_common(limit)
+
+    def snapshot(self, limit: int = 5) -> Dict[str, Any]:
+        return {
+            'totalSessions': self.total,
+            'activeSessions': self.active,
+            'endedSessions': self.ended,
+            'byStatus': dict(self.by_status),
+            'recentSessions': self.recent(),
+            'weekly': self.weekly(),
+            'topHosts': self.top_hosts(limit),
+        }
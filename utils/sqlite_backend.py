@@ -0,0 +1,204 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Any, Dict, Hashable, List
+
+from utils.datastore import COLLECTIONS, JsonBackend
+
+logger = logging.getLogger(__name__)
+
+DATABASE_PATH = os.path.join(os.getcwd(), 'database', 'storage.db')
+
+# Every table keeps the full record as JSON in `data` so new fields need no
+# schema change. The other columns exist for keys and indexes only.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS vehicles (
+    plate TEXT NOT NULL,
+    state TEXT NOT NULL,
+    id TEXT,
+    user_id TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (plate, state)
+);
+CREATE INDEX IF NOT EXISTS idx_vehicles_user_id ON vehicles (user_id);
+
+CREATE TABLE IF NOT EXISTS economy (
+    user_id TEXT PRIMARY KEY,
+    balance INTEGER NOT NULL DEFAULT 0,
+    bank INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    host_id TEXT,
+    status TEXT,
+    created_at TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_status ON sessions (status);
+
+CREATE TABLE IF NOT EXISTS warnings (
+    id INTEGER PRIMARY KEY,
+    user_id TEXT,
+    timestamp TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_warnings_user_id ON warnings (user_id);
+
+CREATE TABLE IF NOT EXISTS timeouts (
+    user_id TEXT PRIMARY KEY,
+    expires_at TEXT,
+    data TEXT NOT NULL
+);
+"""
+
+# Columns added after a table was first created: table -> [(column, type)].
+# Databases from before the column existed get it added on startup.
+ADDED_COLUMNS = {
+    "vehicles": [("id", "TEXT")],
+}
+
+# Indexes on added columns, created once the columns exist
+MIGRATED_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_vehicles_id ON vehicles (id);
+"""
+
+
+def _vehicle_row(key, record):
+    return {"plate": key[0], "state": key[1], "id": record.get("id"), "user_id": record.get("userId")}
+
+
+def _economy_row(key, record):
+    return {"user_id": key, "balance": record.get("balance", 0), "bank": record.get("bank", 0)}
+
+
+def _session_row(key, record):
+    return {"id": key, "host_id": record.get("host_id"), "status": record.get("status"), "created_at": record.get("created_at")}
+
+
+def _warning_row(key, record):
+    return {"id": key, "user_id": record.get("user_id"), "timestamp": record.get("timestamp")}
+
+
+def _timeout_row(key, record):
+    return {"user_id": key, "expires_at": record.get("expires_at")}
+
+
+# name -> (key columns, row builder)
+TABLES = {
+    "vehicles": (("plate", "state"), _vehicle_row),
+    "economy": (("user_id",), _economy_row),
+    "sessions": (("id",), _session_row),
+    "warnings": (("id",), _warning_row),
+    "timeouts": (("user_id",), _timeout_row),
+}
+
+
+class SqliteBackend:
+    """Stores each collection as an SQLite table so a write only touches its own rows"""
+
+    def __init__(self, db_path: str = DATABASE_PATH):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self.conn.commit()
+
+    def _migrate(self):
+        """Bring tables created by an older schema up to date"""
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+            for column, column_type in columns:
+                if column not in existing:
+                    self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+                    logger.info(f"Added column '{column}' to table '{table}'")
+        self.conn.executescript(MIGRATED_SCHEMA)
+
+    def load(self, name: str) -> Dict[Hashable, Dict[str, Any]]:
+        key_columns, _ = TABLES[name]
+        columns = ", ".join(key_columns)
+        records: Dict[Hashable, Dict[str, Any]] = {}
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {columns}, data FROM {name} ORDER BY rowid").fetchall()
+        for row in rows:
+            key = row[0] if len(key_columns) == 1 else tuple(row[:-1])
+            records[key] = json.loads(row[-1])
+        return records
+
+    def needs_snapshot(self, name: str) -> bool:
+        return False
+
+    def write(self, name: str, upserts: List[tuple], deletes: List[Hashable], records: Dict[Hashable, Dict[str, Any]]):
+        """Apply a batch of row changes in one transaction"""
+        key_columns, row_builder = TABLES[name]
+        where = " AND ".join(f"{column} = ?" for column in key_columns)
+
+        with self._lock, self.conn:
+            for key, record in upserts:
+                row = row_builder(key, record)
+                row["data"] = json.dumps(record)
+                columns = ", ".join(row)
+                placeholders = ", ".join("?" for _ in row)
+                updates = ", ".join(f"{column} = excluded.{column}" for column in row if column not in key_columns)
+                # Upsert rather than INSERT OR REPLACE so the rowid (and with it
+                # the original insertion order) is preserved.
+                self.conn.execute(
+                    f"INSERT INTO {name} ({columns}) VALUES ({placeholders}) "
+                    f"ON CONFLICT ({', '.join(key_columns)}) DO UPDATE SET {updates}",
+                    tuple(row.values())
+                )
+            for key in deletes:
+                params = key if isinstance(key, tuple) else (key,)
+                self.conn.execute(f"DELETE FROM {name} WHERE {where}", params)
+
+    def backup(self, name: str):
+        """Copy the database aside before a one-time rewrite of every record in ``name``"""
+        root, ext = os.path.splitext(self.db_path)
+        backup_path = f"{root}_backup_{time.strftime('%Y%m%d_%H%M%S')}{ext}"
+        with self._lock:
+            target = sqlite3.connect(backup_path)
+            try:
+                self.conn.backup(target)
+            finally:
+                target.close()
+        logger.info(f"Backed up {os.path.basename(self.db_path)} as {os.path.basename(backup_path)}")
+
+    def count(self, name: str) -> int:
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def migrate_json_to_sqlite(data_dir=None, db_path: str = DATABASE_PATH, force: bool = False) -> Dict[str, int]:
+    """One-shot import of the data/*.json collections into SQLite.
+
+    Tables that already contain rows are skipped unless ``force`` is set.
+    Returns the number of records imported per collection.
+    """
+    source = JsonBackend(data_dir) if data_dir else JsonBackend()
+    target = SqliteBackend(db_path)
+    imported = {}
+    try:
+        for name in COLLECTIONS:
+            if target.count(name) and not force:
+                logger.info(f"Table '{name}' already has data, skipping")
+                imported[name] = 0
+                continue
+            records = source.load(name)
+            target.write(name, list(records.items()), [], records)
+            imported[name] = len(records)
+            logger.info(f"Imported {len(records)} records into '{name}'")
+    finally:
+        target.close()
+    return imported
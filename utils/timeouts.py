@@ -0,0 +1,112 @@
+import asyncio
+import heapq
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def expiry_timestamp(record: Dict[str, Any]) -> float:
+    """Unix time at which a timeout record expires (expires_at is naive UTC ISO)"""
+    return datetime.fromisoformat(record["expires_at"]).replace(tzinfo=timezone.utc).timestamp()
+
+
+class TimeoutLedger:
+    """Active member timeouts, persisted in the ``timeouts`` collection (data/mutes.json).
+
+    /timeout and /untimeout record here. A min-heap of (expiry, user id)
+    drives one task on the bot loop that sleeps until the next expiry, so
+    expiries are handled on time without polling, and the number of active
+    timeouts is just the size of the collection. Timeouts that ran out while
+    the bot was offline expire as soon as the scheduler starts.
+    """
+
+    def __init__(self, store, on_expire: Optional[Callable[[Dict[str, Any]], None]] = None):
+        self.store = store
+        self.on_expire = on_expire
+        # (expiry, user id); entries for removed or replaced timeouts are
+        # skipped when they reach the top instead of being searched for
+        self._heap: List[Tuple[float, str]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        store.subscribe("timeouts", self._on_change, replay=True)
+        logger.info(f"Timeout ledger ready ({len(self)} active)")
+
+    def __len__(self) -> int:
+        return self.store.count("timeouts")
+
+    def _on_change(self, key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        if new is None or (old is not None and old.get("expires_at") == new.get("expires_at")):
+            return
+        try:
+            heapq.heappush(self._heap, (expiry_timestamp(new), key))
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Ignoring timeout for {key} without a valid expires_at")
+            return
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def record(self, user_id, guild_id, moderator_id, until: datetime, duration: str, reason: str) -> Dict[str, Any]:
+        """Track a timeout that was just applied (replacing any earlier one for the user)"""
+        return self.store.put("timeouts", {
+            "user_id": str(user_id),
+            "guild_id": str(guild_id),
+            "moderator_id": str(moderator_id),
+            "reason": reason,
+            "duration": duration,
+            "started_at": datetime.utcnow().isoformat(),
+            "expires_at": until.replace(tzinfo=None).isoformat(),
+        })
+
+    def remove(self, user_id) -> Optional[Dict[str, Any]]:
+        """Stop tracking a user's timeout (lifted early). Returns the removed record."""
+        return self.store.delete("timeouts", str(user_id))
+
+    def get(self, user_id) -> Optional[Dict[str, Any]]:
+        return self.store.get("timeouts", str(user_id))
+
+    def active(self) -> List[Dict[str, Any]]:
+        """Active timeouts, soonest expiry first"""
+        return sorted(self.store.all("timeouts"), key=lambda record: record["expires_at"])
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            if delay is None:
+                await self._wakeup.wait()
+            elif delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                self._expire_due()
+            except Exception as e:
+                logger.error(f"Error expiring timeouts: {e}")
+
+    def _expire_due(self):
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            expires, user_id = heapq.heappop(self._heap)
+            record = self.store.get("timeouts", user_id)
+            if record is None or expiry_timestamp(record) != expires:
+                continue  # Lifted early or replaced by a newer timeout
+            self.store.delete("timeouts", user_id)
+            logger.info(f"Timeout for {user_id} expired")
+            if self.on_expire:
+                try:
+                    self.on_expire(record)
+                except Exception as e:
+                    logger.error(f"Error handling expired timeout for {user_id}: {e}")
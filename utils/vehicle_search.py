@@ -0,0 +1,212 @@
+import bisect
+import re
+import logging
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# How much a hit in each field counts towards a result's score
+FIELD_WEIGHTS = {
+    "plate": 3.0,
+    "make": 2.0,
+    "model": 2.0,
+    "color": 1.0,
+    "owner": 1.0,
+}
+
+# How much each kind of token match counts
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.0
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein distance, giving up early once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = 0 if ca == cb else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def max_typos(token: str) -> int:
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+
+class VehicleSearchIndex:
+    """Inverted index over plate, make, model and color, plus exact owner IDs.
+
+    Subscribed to the store's vehicles collection, so it is updated on
+    every registration, transfer and deletion instead of being rebuilt per
+    query. Queries match whole tokens, prefixes and (for tokens of four or
+    more characters) small typos, and results are ranked by score. An owner
+    ID matches only in full, through the store's owner index.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # token -> {vehicle key: summed field weight}
+        self._postings: Dict[str, Dict[Hashable, float]] = {}
+        # vehicle key -> {token: field weight} so removals don't need the old record
+        self._documents: Dict[Hashable, Dict[str, float]] = {}
+        # sorted vocabulary for prefix lookups
+        self._vocabulary: List[str] = []
+        # trigram -> tokens, for typo-tolerant lookups
+        self._trigrams: Dict[str, Set[str]] = {}
+        store.subscribe("vehicles", self._on_change, replay=True)
+        logger.info(f"Built vehicle search index with {len(self._vocabulary)} terms")
+
+    def _fields(self, vehicle: Dict[str, Any]) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        values = {
+            "plate": vehicle.get("plate", ""),
+            "make": vehicle.get("make", ""),
+            "model": vehicle.get("model", ""),
+            "color": vehicle.get("color", ""),
+        }
+        for field, value in values.items():
+            tokens = tokenize(str(value))
+            if field == "plate" and len(tokens) > 1:
+                # "ABC-123" should also match "abc123"
+                tokens.append("".join(tokens))
+            for token in tokens:
+                weights[token] = max(weights.get(token, 0.0), FIELD_WEIGHTS[field])
+        return weights
+
+    def _on_change(self, key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        self._remove(key)
+        if new is not None:
+            self._add(key, new)
+
+    def _add(self, key: Hashable, vehicle: Dict[str, Any]):
+        document = self._fields(vehicle)
+        self._documents[key] = document
+        for token, weight in document.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._vocabulary, token)
+                for gram in trigrams(token):
+                    self._trigrams.setdefault(gram, set()).add(token)
+            postings[key] = weight
+
+    def _remove(self, key: Hashable):
+        document = self._documents.pop(key, None)
+        if not document:
+            return
+        for token in document:
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+                index = bisect.bisect_left(self._vocabulary, token)
+                if index < len(self._vocabulary) and self._vocabulary[index] == token:
+                    del self._vocabulary[index]
+                for gram in trigrams(token):
+                    tokens = self._trigrams.get(gram)
+                    if tokens is not None:
+                        tokens.discard(token)
+                        if not tokens:
+                            del self._trigrams[gram]
+
+    def _prefix_matches(self, prefix: str) -> List[str]:
+        index = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(prefix):
+            matches.append(self._vocabulary[index])
+            index += 1
+        return matches
+
+    def _fuzzy_matches(self, token: str) -> List[str]:
+        limit = max_typos(token)
+        if not limit:
+            return []
+        grams = trigrams(token)
+        shared: Dict[str, int] = {}
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        # Each edit can break at most three trigrams
+        needed = max(1, len(grams) - 3 * limit)
+        return [
+            candidate for candidate, count in shared.items()
+            if count >= needed and edit_distance(token, candidate, limit) <= limit
+        ]
+
+    def _score_token(self, token: str) -> Dict[Hashable, float]:
+        scores: Dict[Hashable, float] = {}
+
+        def add(matched: str, match_score: float):
+            for key, weight in self._postings.get(matched, {}).items():
+                scores[key] = max(scores.get(key, 0.0), match_score * weight)
+
+        add(token, EXACT_SCORE)
+        # Owner IDs only match in full; as text every snowflake would share
+        # prefixes and near misses with every other one
+        for vehicle in self.store.find("vehicles", "owner", token):
+            key = self.store.key_for("vehicles", vehicle)
+            scores[key] = max(scores.get(key, 0.0), EXACT_SCORE * FIELD_WEIGHTS["owner"])
+        for matched in self._prefix_matches(token):
+            if matched != token:
+                add(matched, PREFIX_SCORE)
+        for matched in self._fuzzy_matches(token):
+            if matched != token:
+                add(matched, FUZZY_SCORE)
+        return scores
+
+    def search(self, query: str, state: Optional[str] = None, owner_id: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return matching vehicles, best match first.
+
+        Every query token has to match something. Results are read-only
+        records from the store.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        scores: Optional[Dict[Hashable, float]] = None
+        for token in tokens:
+            token_scores = self._score_token(token)
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {key: score + token_scores[key] for key, score in scores.items() if key in token_scores}
+            if not scores:
+                return []
+
+        ranked = sorted(scores, key=lambda key: scores[key], reverse=True)
+        results = []
+        for vehicle in self.store.get_many("vehicles", ranked):
+            if state and vehicle.get("state", "").upper() != state.upper():
+                continue
+            if owner_id and vehicle.get("userId") != owner_id:
+                continue
+            results.append(vehicle)
+            if limit and len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,74 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def registration_day(vehicle: Dict[str, Any]) -> Optional[str]:
+    """YYYY-MM-DD of registration, or None if the timestamp is missing or invalid"""
+    try:
+        return datetime.fromisoformat(vehicle['registeredAt'].replace('Z', '+00:00')).date().isoformat()
+    except (KeyError, AttributeError, ValueError):
+        return None
+
+
+class VehicleStats:
+    """Vehicle counters maintained on every write to the vehicles collection.
+
+    /vehicle_stats, the admin portal and /api/stats read these instead of
+    scanning every vehicle on each request.
+    """
+
+    def __init__(self, store):
+        self.total = 0
+        self.by_state: Counter = Counter()
+        self.by_make: Counter = Counter()
+        self.by_color: Counter = Counter()
+        self.by_day: Counter = Counter()
+        store.subscribe("vehicles", self._on_change, replay=True)
+        logger.info(f"Vehicle statistics ready ({self.total} vehicles)")
+
+    @staticmethod
+    def _labels(vehicle: Dict[str, Any]) -> Tuple[str, str, str, Optional[str]]:
+        return (
+            vehicle.get('state') or 'Unknown',
+            (vehicle.get('make') or 'Unknown').title(),
+            (vehicle.get('color') or 'Unknown').title(),
+            registration_day(vehicle),
+        )
+
+    def _apply(self, vehicle: Dict[str, Any], delta: int):
+        state, make, color, day = self._labels(vehicle)
+        self.total += delta
+        for counter, label in ((self.by_state, state), (self.by_make, make), (self.by_color, color), (self.by_day, day)):
+            if label is None:
+                continue
+            counter[label] += delta
+            if counter[label] <= 0:
+                del counter[label]
+
+    def _on_change(self, key: Hashable, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]]):
+        if old is not None:
+            self._apply(old, -1)
+        if new is not None:
+            self._apply(new, 1)
+
+    def recent(self, days: int = 7) -> int:
+        """Vehicles registered within the last ``days`` days (by calendar day)"""
+        today = datetime.utcnow().date()
+        return sum(self.by_day.get((today - timedelta(days=offset)).isoformat(), 0) for offset in range(days))
+
+    def top(self, counter: Counter, limit: int = 5) -> List[Tuple[str, int]]:
+        return counter.most_common(limit)
+
+    def snapshot(self, limit: int = 5) -> Dict[str, Any]:
+        return {
+            'totalVehicles': self.total,
+            'uniqueStates': len(self.by_state),
+            'recentRegistrations': self.recent(),
+            'topStates': self.top(self.by_state, limit),
+            'topMakes': self.top(self.by_make, limit),
+            'topColors': self.top(self.by_color, limit),
+        }
@@ -15,10 +15,60 @@ document.addEventListener('DOMContentLoaded', function() {
     setupEventListeners();
     populateStateSelects();
     
-    // Auto-refresh data every 30 seconds
-    setInterval(refreshCurrentSection, 30000);
+    // Live updates pushed by the server; fall back to polling if unsupported
+    if (window.EventSource) {
+        connectLiveUpdates();
+    } else {
+        setInterval(refreshCurrentSection, 30000);
+    }
 });
 
+// Which sections need reloading for each kind of server event
+const EVENT_SECTIONS = {
+    vehicle: ['dashboard', 'vehicles'],
+    economy: ['dashboard', 'economy'],
+    session: ['dashboard', 'sessions'],
+    warning: ['dashboard', 'moderation'],
+    timeout: ['moderation'],
+    activity: ['dashboard']
+};
+
+let liveRefreshTimer = null;
+
+// Subscribe to /api/events and refresh the visible section when its data changes
+function connectLiveUpdates() {
+    const source = new EventSource('/api/events');
+    
+    Object.keys(EVENT_SECTIONS).forEach(prefix => {
+        ['registered', 'updated', 'deleted', 'balance_changed', 'created', 'issued', 'removed', 'logged'].forEach(action => {
+            source.addEventListener(`${prefix}.${action}`, () => scheduleLiveRefresh(prefix));
+        });
+    });
+    
+    // Sent instead of a long run of events (e.g. a bulk import)
+    source.addEventListener('stream.resync', refreshCurrentSection);
+    
+    // EventSource reconnects by itself; catch up on anything missed while down
+    let connectedBefore = false;
+    source.addEventListener('open', () => {
+        if (connectedBefore) {
+            refreshCurrentSection();
+        }
+        connectedBefore = true;
+    });
+}
+
+// Coalesce bursts of events (e.g. bulk deletes) into a single reload
+function scheduleLiveRefresh(prefix) {
+    if (!EVENT_SECTIONS[prefix].includes(currentSection) || liveRefreshTimer !== null) {
+        return;
+    }
+    liveRefreshTimer = setTimeout(() => {
+        liveRefreshTimer = null;
+        refreshCurrentSection();
+    }, 1000);
+}
+
 // Initialize application
 function initializeApp() {
     // Set up navigation
@@ -210,14 +260,49 @@ async function loadRecentActivity() {
     }
 }
 
-// Load vehicle data from real JSON
-async function loadVehicleData() {
+// Cursor for the next page of each paginated table (null = no more pages)
+const pageCursors = {
+    vehicles: null,
+    economy: null
+};
+
+// Build a query string, skipping empty values
+function buildQuery(params) {
+    const query = new URLSearchParams();
+    Object.entries(params).forEach(([key, value]) => {
+        if (value !== null && value !== undefined && value !== '') {
+            query.set(key, value);
+        }
+    });
+    const text = query.toString();
+    return text ? `?${text}` : '';
+}
+
+// Show or hide a "Load more" button depending on whether a next page exists
+function updateLoadMore(buttonId, cursor) {
+    const button = document.getElementById(buttonId);
+    if (button) {
+        button.style.display = cursor ? '' : 'none';
+    }
+}
+
+// Load vehicle data (one page at a time, filtered and sorted by the server)
+async function loadVehicleData(append = false) {
     try {
         showLoading('vehicles-table');
         
-        const vehicles = await apiCall('/api/vehicles');
-        botData.vehicles = vehicles;
+        const query = buildQuery({
+            q: document.getElementById('vehicle-search')?.value.trim(),
+            state: document.getElementById('state-filter')?.value,
+            sort: 'registeredAt',
+            order: 'desc',
+            cursor: append ? pageCursors.vehicles : null
+        });
+        const page = await apiCall(`/api/vehicles${query}`);
+        botData.vehicles = append ? botData.vehicles.concat(page.items) : page.items;
+        pageCursors.vehicles = page.nextCursor;
         
+        const vehicles = botData.vehicles;
         const tbody = document.querySelector('#vehicles-table tbody');
         if (vehicles.length === 0) {
             tbody.innerHTML = '<tr><td colspan="8" class="text-center">No vehicles registered</td></tr>';
@@ -250,6 +335,8 @@ async function loadVehicleData() {
             `).join('');
         }
 
+        document.getElementById('vehicles-count').textContent = `Showing ${vehicles.length} of ${page.total}`;
+        updateLoadMore('vehicles-load-more', pageCursors.vehicles);
         setupVehicleFilters();
         hideLoading('vehicles-table');
     } catch (error) {
@@ -259,13 +346,17 @@ async function loadVehicleData() {
     }
 }
 
-// Load economy data from real JSON
-async function loadEconomyData() {
+// Load economy data (ranked by wealth, one page at a time)
+async function loadEconomyData(append = false) {
     try {
         showLoading('economy-table');
         
-        const economyData = await apiCall('/api/economy');
-        botData.economy = economyData.users || [];
+        const query = buildQuery({
+            cursor: append ? pageCursors.economy : null
+        });
+        const economyData = await apiCall(`/api/economy${query}`);
+        botData.economy = append ? botData.economy.concat(economyData.users) : economyData.users;
+        pageCursors.economy = economyData.nextCursor;
         
         // Update economy stats
         document.getElementById('total-money').textContent = `$${economyData.totalMoney.toLocaleString()}`;
@@ -273,11 +364,12 @@ async function loadEconomyData() {
         document.getElementById('richest-user').textContent = economyData.richestUser;
 
         // Update economy table
+        const users = botData.economy;
         const tbody = document.querySelector('#economy-table tbody');
-        if (economyData.users.length === 0) {
+        if (users.length === 0) {
             tbody.innerHTML = '<tr><td colspan="6" class="text-center">No economy data available</td></tr>';
         } else {
-            tbody.innerHTML = economyData.users.slice(0, 50).map(user => `
+            tbody.innerHTML = users.map(user => `
                 <tr>
                     <td>
                         <div class="user-cell">
@@ -298,6 +390,7 @@ async function loadEconomyData() {
             `).join('');
         }
         
+        updateLoadMore('economy-load-more', pageCursors.economy);
         hideLoading('economy-table');
     } catch (error) {
         console.error('Error loading economy data:', error);
@@ -486,7 +579,14 @@ function setupEventListeners() {
 }
 
 // Setup vehicle filters
+let vehicleFiltersReady = false;
+
 function setupVehicleFilters() {
+    if (vehicleFiltersReady) {
+        return;
+    }
+    vehicleFiltersReady = true;
+    
     const searchInput = document.getElementById('vehicle-search');
     const stateFilter = document.getElementById('state-filter');
     
@@ -499,34 +599,9 @@ function setupVehicleFilters() {
     }
 }
 
-// Filter vehicles
+// Filter vehicles (the server applies the search and state filter)
 function filterVehicles() {
-    const searchTerm = document.getElementById('vehicle-search')?.value.toLowerCase() || '';
-    const stateFilter = document.getElementById('state-filter')?.value || '';
-    
-    const rows = document.querySelectorAll('#vehicles-table tbody tr');
-    
-    rows.forEach(row => {
-        if (row.cells.length < 8) return; // Skip empty state rows
-        
-        const plate = row.cells[0].textContent.toLowerCase();
-        const state = row.cells[1].textContent;
-        const make = row.cells[2].textContent.toLowerCase();
-        const model = row.cells[3].textContent.toLowerCase();
-        const color = row.cells[4].textContent.toLowerCase();
-        const owner = row.cells[5].textContent.toLowerCase();
-        
-        const matchesSearch = !searchTerm || 
-            plate.includes(searchTerm) || 
-            make.includes(searchTerm) || 
-            model.includes(searchTerm) || 
-            color.includes(searchTerm) || 
-            owner.includes(searchTerm);
-            
-        const matchesState = !stateFilter || state === stateFilter;
-        
-        row.style.display = matchesSearch && matchesState ? '' : 'none';
-    });
+    loadVehicleData();
 }
 
 // Populate state selects
@@ -538,7 +613,7 @@ function populateStateSelects() {
         'SC', 'SD', 'TN', 'TX', 'UT', 'VT', 'VA', 'WA', 'WV', 'WI', 'WY'
     ];
 
-    const stateSelects = document.querySelectorAll('#state-filter, #vehicle-state');
+    const stateSelects = document.querySelectorAll('#state-filter, #vehicle-state, #edit-vehicle-state');
     stateSelects.forEach(select => {
         if (select.id === 'state-filter') {
             select.innerHTML = '<option value="">All States</option>' + 
@@ -613,14 +688,55 @@ async function addVehicle() {
     }
 }
 
+let editingVehicleId = null;
+
 function editVehicle(vehicleIndex) {
-    showNotification('Edit vehicle functionality coming soon!', 'info');
+    const vehicle = botData.vehicles[vehicleIndex];
+    if (!vehicle) return;
+    
+    editingVehicleId = vehicle.id;
+    document.getElementById('edit-vehicle-owner').value = vehicle.userId || '';
+    document.getElementById('edit-vehicle-make').value = vehicle.make || '';
+    document.getElementById('edit-vehicle-model').value = vehicle.model || '';
+    document.getElementById('edit-vehicle-color').value = vehicle.color || '';
+    document.getElementById('edit-vehicle-state').value = vehicle.state || '';
+    document.getElementById('edit-vehicle-plate').value = vehicle.plate || '';
+    openModal('editVehicleModal');
+}
+
+async function saveVehicle() {
+    if (!editingVehicleId) return;
+    
+    const vehicleData = {
+        owner: document.getElementById('edit-vehicle-owner').value.trim(),
+        make: document.getElementById('edit-vehicle-make').value.trim(),
+        model: document.getElementById('edit-vehicle-model').value.trim(),
+        color: document.getElementById('edit-vehicle-color').value.trim(),
+        state: document.getElementById('edit-vehicle-state').value,
+        plate: document.getElementById('edit-vehicle-plate').value.trim()
+    };
+    
+    if (Object.values(vehicleData).some(value => !value)) {
+        showNotification('Please fill in all required fields', 'error');
+        return;
+    }
+    
+    try {
+        await apiCall(`/api/vehicles/${editingVehicleId}`, 'PATCH', vehicleData);
+        showNotification('Vehicle updated successfully!', 'success');
+        editingVehicleId = null;
+        closeModal('editVehicleModal');
+        loadVehicleData();
+    } catch (error) {
+        showNotification('Error updating vehicle: ' + error.message, 'error');
+    }
 }
 
 async function deleteVehicle(vehicleIndex) {
-    if (confirm('Are you sure you want to delete this vehicle?')) {
+    const vehicle = botData.vehicles[vehicleIndex];
+    if (vehicle && confirm('Are you sure you want to delete this vehicle?')) {
         try {
-            await apiCall(`/api/vehicles/${vehicleIndex}`, 'DELETE');
+            await apiCall(`/api/vehicles/${vehicle.id}`, 'DELETE');
             showNotification('Vehicle deleted successfully!', 'success');
             loadVehicleData();
         } catch (error) {
@@ -629,15 +745,50 @@ async function deleteVehicle(vehicleIndex) {
     }
 }
 
-function exportVehicles() {
-    if (botData.vehicles.length === 0) {
-        showNotification('No vehicles to export', 'error');
-        return;
-    }
+// The server streams the export, so it covers every matching vehicle, not just the loaded pages
+function exportVehicles(format = 'csv') {
+    const query = buildQuery({
+        format,
+        q: document.getElementById('vehicle-search')?.value.trim(),
+        state: document.getElementById('state-filter')?.value
+    });
+    downloadFile(`/api/vehicles/export${query}`, `vehicles.${format}`);
+    showNotification('Vehicle export started', 'success');
+}
+
+const IMPORT_CONTENT_TYPES = {
+    csv: 'text/csv',
+    ndjson: 'application/x-ndjson',
+    jsonl: 'application/x-ndjson',
+    json: 'application/json'
+};
+
+async function importVehicles(input) {
+    const file = input.files[0];
+    input.value = '';
+    if (!file) return;
     
-    const csv = convertToCSV(botData.vehicles);
-    downloadCSV(csv, 'vehicles.csv');
-    showNotification('Vehicles exported successfully!', 'success');
+    const extension = file.name.split('.').pop().toLowerCase();
+    try {
+        const response = await fetch('/api/vehicles/import', {
+            method: 'POST',
+            headers: { 'Content-Type': IMPORT_CONTENT_TYPES[extension] || 'application/json' },
+            body: file
+        });
+        const result = await response.json().catch(() => ({}));
+        if (!response.ok) {
+            throw new Error(result.error || `HTTP error! status: ${response.status}`);
+        }
+        
+        const skipped = result.duplicates + result.invalid;
+        showNotification(
+            `Imported ${result.imported} vehicles` + (skipped ? ` (${result.duplicates} duplicates, ${result.invalid} invalid skipped)` : ''),
+            result.imported ? 'success' : 'error'
+        );
+        loadVehicleData();
+    } catch (error) {
+        showNotification(`Import failed: ${error.message}`, 'error');
+    }
 }
 
 // Economy functions
@@ -842,21 +993,7 @@ function hideButtonLoading(buttonId, originalText) {
     }
 }
 
-function convertToCSV(data) {
-    if (!data.length) return '';
-    
-    const headers = Object.keys(data[0]);
-    const csvContent = [
-        headers.join(','),
-        ...data.map(row => headers.map(header => `"${row[header] || ''}"`).join(','))
-    ].join('\n');
-    
-    return csvContent;
-}
-
-function downloadCSV(csv, filename) {
-    const blob = new Blob([csv], { type: 'text/csv' });
-    const url = window.URL.createObjectURL(blob);
+function downloadFile(url, filename) {
     const a = document.createElement('a');
     a.setAttribute('hidden', '');
     a.setAttribute('href', url);
@@ -864,7 +1001,6 @@ function downloadCSV(csv, filename) {
     document.body.appendChild(a);
     a.click();
     document.body.removeChild(a);
-    window.URL.revokeObjectURL(url);
 }
 
 function debounce(func, wait) {
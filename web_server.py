@@ -4,30 +4,54 @@ MGVRP Bot Web Management Server
 Provides a web interface for managing the Discord bot with real data integration
 """
 
+import io
 import os
+import re
+import csv
+import gzip
 import json
+import time
+import heapq
+import base64
 import asyncio
+import hashlib
+import functools
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 
-from flask import Flask, render_template, request, jsonify, send_from_directory
-from flask_cors import CORS
-import discord
-from discord.ext import commands
+from aiohttp import web
 import logging
 
+from repair_vehicles_json import vehicle_error
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # Optional: gzip is used when brotli isn't installed
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Configuration
-DATA_DIR = Path("data")
 WEB_DIR = Path("web")
 GUILD_ID = int(os.getenv("GUILD_ID", "1277047315047120978"))
+SSE_HEARTBEAT = 15  # seconds between keep-alive comments on /api/events
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+VEHICLE_SORT_FIELDS = ('registeredAt', 'plate', 'state', 'make', 'model', 'color')
+RESPONSE_CACHE_SIZE = 128  # serialized JSON responses kept for conditional GETs
+COMPRESS_MIN_SIZE = 1024  # smaller bodies aren't worth compressing
+STATIC_MAX_AGE = 365 * 24 * 3600  # fingerprinted assets never change under the same URL
+EXPORT_CHUNK_SIZE = 500  # vehicles serialized per write on /api/vehicles/export
+EXPORT_FIELDS = ('id', 'plate', 'state', 'make', 'model', 'color', 'userId', 'ownerName', 'registeredAt')
+IMPORT_FIELDS = ('userId', 'make', 'model', 'color', 'state', 'plate', 'registeredAt')
+IMPORT_MAX_BYTES = 16 * 1024 * 1024  # request body limit, sized for bulk imports
+IMPORT_REPORTED_ROWS = 100  # invalid row numbers listed in an import response
 
-app = Flask(__name__, static_folder='web', template_folder='web')
-CORS(app)
+routes = web.RouteTableDef()
 
 # Bot reference (will be set when bot starts)
 bot_instance = None
@@ -35,62 +59,67 @@ bot_instance = None
 class WebManager:
     def __init__(self, bot):
         self.bot = bot
+        self.store = bot.datastore
         global bot_instance
         bot_instance = bot
     
-    def load_json_file(self, filename: str) -> Dict[str, Any]:
-        """Load data from JSON file"""
-        file_path = DATA_DIR / filename
-        try:
-            if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            else:
-                logger.warning(f"File {filename} not found, returning empty data")
-                return {}
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing {filename}: {e}")
-            return {}
-        except Exception as e:
-            logger.error(f"Error loading {filename}: {e}")
-            return {}
+    def member_profiles(self, user_ids, placeholder: str = "User") -> Dict[str, tuple]:
+        """(display name, avatar URL) per user id, served from the member profile cache"""
+        return self.bot.member_cache.lookup_many(user_ids, placeholder)
     
-    def save_json_file(self, filename: str, data: Dict[str, Any]) -> bool:
-        """Save data to JSON file"""
-        file_path = DATA_DIR / filename
-        try:
-            DATA_DIR.mkdir(exist_ok=True)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            logger.error(f"Error saving {filename}: {e}")
-            return False
+    def data_version(self, collections, extra=None) -> tuple:
+        """Everything a cached response depends on; any change means a new ETag"""
+        return (
+            self.store.instance_id,
+            tuple(self.store.generation(name) for name in collections),
+            self.bot.member_cache.version,
+            extra() if extra else None,
+        )
+    
+    async def apply_economy_action(self, user_id: str, action: str, amount: int, target: str):
+        """Apply a dashboard economy action under the same lock the economy cog uses"""
+        async with self.store.locked("economy", user_id):
+            user_data = self.store.get("economy", user_id)
+            
+            if user_data is None:
+                user_data = {
+                    'balance': 0,
+                    'bank': 0,
+                    'total_earned': 0,
+                    'total_spent': 0
+                }
+            
+            if action == 'add':
+                user_data[target] += amount
+                user_data['total_earned'] += amount
+            elif action == 'remove':
+                user_data[target] = max(0, user_data[target] - amount)
+                user_data['total_spent'] += amount
+            elif action == 'set':
+                user_data[target] = amount
+            
+            self.store.put("economy", user_data, key=user_id)
     
     def get_bot_stats(self) -> Dict[str, Any]:
         """Get comprehensive bot statistics from real data"""
         try:
             # Vehicle stats
-            vehicles_data = self.load_json_file("vehicles.json")
-            total_vehicles = len(vehicles_data.get('vehicles', []))
+            vehicle_stats = self.bot.vehicle_stats.snapshot()
+            total_vehicles = vehicle_stats['totalVehicles']
             
             # Economy stats
-            economy_data = self.load_json_file("economy.json")
-            total_users = len(economy_data.get('users', {}))
+            total_users = self.store.count("economy")
             
             # Session stats
-            sessions_data = self.load_json_file("sessions.json")
-            sessions = sessions_data.get('sessions', [])
-            active_sessions = len([s for s in sessions if s.get('status') != 'Ended'])
+            active_sessions = self.bot.session_stats.active
             
             # Warning stats
-            warnings_data = self.load_json_file("warnings.json")
-            total_warnings = len(warnings_data.get('data', []))
+            total_warnings = self.store.count("warnings")
             
-            # System stats
-            import psutil
-            memory_usage = f"{psutil.virtual_memory().percent:.1f}%"
-            cpu_usage = f"{psutil.cpu_percent(interval=1):.1f}%"
+            # System stats (sampled in the background, see utils/metrics.py)
+            system = self.bot.system_metrics.latest()
+            memory_usage = f"{system['memory']:.1f}%"
+            cpu_usage = f"{system['cpu']:.1f}%"
             
             # Bot uptime
             if hasattr(self.bot, 'start_time'):
@@ -112,7 +141,11 @@ class WebManager:
                 'uptime': uptime,
                 'botStatus': 'online' if self.bot.is_ready() else 'offline',
                 'guildCount': len(self.bot.guilds) if self.bot.guilds else 0,
-                'memberCount': sum(guild.member_count for guild in self.bot.guilds) if self.bot.guilds else 0
+                'memberCount': sum(guild.member_count for guild in self.bot.guilds) if self.bot.guilds else 0,
+                'vehicleStats': vehicle_stats,
+                'loopLag': self.bot.loop_monitor.snapshot(),
+                'system': system,
+                'systemHistory': self.bot.system_metrics.history()
             }
         except Exception as e:
             logger.error(f"Error getting bot stats: {e}")
@@ -132,76 +165,334 @@ class WebManager:
 # Initialize web manager
 web_manager = None
 
-# Routes
-@app.route('/')
-def index():
-    """Serve the main web interface"""
-    return send_from_directory('web', 'index.html')
+def accepted_encoding(request) -> Optional[str]:
+    """Best content coding we support from the Accept-Encoding header"""
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').lower().split(','):
+        coding, _, params = part.strip().partition(';')
+        if coding and params.replace(' ', '') not in ('q=0', 'q=0.0'):
+            accepted.add(coding)
+    if brotli and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
 
-@app.route('/<path:filename>')
-def serve_static(filename):
-    """Serve static files"""
-    return send_from_directory('web', filename)
+class EncodedBody:
+    """A response body plus its compressed variants, each built once on first use"""
+    
+    def __init__(self, body: bytes):
+        self._variants = {None: body}
+    
+    def get(self, encoding: Optional[str]) -> bytes:
+        if encoding not in self._variants:
+            body = self._variants[None]
+            self._variants[encoding] = brotli.compress(body) if encoding == 'br' else gzip.compress(body, 6)
+        return self._variants[encoding]
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """Strong ETag for one encoding of a body, e.g. "abc" -> "abc-gzip" """
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+def encoded_response(request, body: EncodedBody, content_type: str, etag: str, headers: Dict[str, str],
+                     compressible: bool = True) -> web.Response:
+    """Answer a GET for ``body`` in the client's best encoding, or a 304 if it already has that variant.
+    
+    Each encoding gets its own ETag, since the identity, gzip and br bytes
+    differ and a strong validator has to identify exact bytes.
+    """
+    encoding = None
+    headers = dict(headers)
+    if compressible:
+        headers['Vary'] = 'Accept-Encoding'
+        if len(body.get(None)) >= COMPRESS_MIN_SIZE:
+            encoding = accepted_encoding(request)
+    headers['ETag'] = variant_etag(etag, encoding)
+    if etag_matches(request, headers['ETag']):
+        return web.Response(status=304, headers=headers)
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return web.Response(body=body.get(encoding), content_type=content_type, headers=headers)
+
+class ResponseCache:
+    """Serialized JSON bodies keyed by URL and tagged with the data version they were built from"""
+    
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+    
+    @staticmethod
+    def etag_for(url: str, version: tuple) -> str:
+        return '"' + hashlib.sha1(f"{url}|{version!r}".encode()).hexdigest()[:20] + '"'
+    
+    def get(self, url: str, version: tuple):
+        entry = self._entries.get(url)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(url)
+        return entry[1], entry[2]
+    
+    def put(self, url: str, version: tuple, body: bytes):
+        etag = self.etag_for(url, version)
+        body = EncodedBody(body)
+        self._entries[url] = (version, etag, body)
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return etag, body
+
+response_cache = ResponseCache()
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or etag in tags or f"W/{etag}" in tags
+
+def conditional(*collections, extra=None):
+    """Serve a GET route from the response cache with an ETag.
+    
+    The ETag is derived from the store generations of ``collections`` (plus
+    the member cache and ``extra()``), so a repeated request for unchanged
+    data gets a 304 without running the handler or re-serializing JSON.
+    """
+    def decorator(handler):
+        @functools.wraps(handler)
+        async def wrapper(request):
+            if not web_manager:
+                return await handler(request)
+            
+            version = web_manager.data_version(collections, extra)
+            url = request.path_qs
+            cached = response_cache.get(url, version)
+            if cached is None:
+                response = await handler(request)
+                if response.status != 200 or not isinstance(response.body, bytes):
+                    return response
+                cached = response_cache.put(url, version, response.body)
+            
+            etag, body = cached
+            return encoded_response(request, body, 'application/json', etag, {'Cache-Control': 'no-cache'})
+        return wrapper
+    return decorator
+
+def minute_bucket():
+    # For responses that embed relative times ("5m ago") or uptime
+    return int(time.time() // 60)
+
+def stats_version():
+    latest = web_manager.bot.system_metrics.samples
+    return minute_bucket(), latest[-1]['timestamp'] if latest else None, web_manager.bot.is_ready()
+
+class BadRequest(ValueError):
+    """Invalid query parameter; reported to the client as a 400"""
+
+def encode_cursor(values: list) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def decode_cursor(token: Optional[str]) -> Optional[list]:
+    if not token:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode()))
+    except (ValueError, TypeError):
+        raise BadRequest('Invalid cursor')
+    if not isinstance(values, list):
+        raise BadRequest('Invalid cursor')
+    return values
+
+def page_size(request) -> int:
+    try:
+        limit = int(request.query.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise BadRequest('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def sort_order(request, default: str = 'asc') -> bool:
+    """True for descending"""
+    order = request.query.get('order', default).lower()
+    if order not in ('asc', 'desc'):
+        raise BadRequest("order must be 'asc' or 'desc'")
+    return order == 'desc'
+
+def vehicle_sort_key(vehicle: Dict[str, Any], field: str) -> list:
+    # plate/state break ties so every vehicle has a unique position
+    return [str(vehicle.get(field) or '').lower(), vehicle.get('plate', ''), vehicle.get('state', '')]
 
-@app.route('/api/stats')
-def get_stats():
+def filtered_vehicles(query) -> Iterator[Dict[str, Any]]:
+    """Vehicles matching the state, owner, make and q (search) query parameters"""
+    store = web_manager.store
+    state = query.get('state', '').upper() or None
+    owner = query.get('owner') or None
+    make = query.get('make', '').lower() or None
+    search = query.get('q', '').strip()
+    
+    # Narrow the candidates with an index where one applies
+    if search:
+        candidates = web_manager.bot.vehicle_search.search(search, state=state, owner_id=owner)
+    elif owner:
+        candidates = store.find("vehicles", "owner", owner)
+    else:
+        candidates = store.all("vehicles")
+    
+    for vehicle in candidates:
+        if state and vehicle.get('state', '').upper() != state:
+            continue
+        if owner and vehicle.get('userId') != owner:
+            continue
+        if make and vehicle.get('make', '').lower() != make:
+            continue
+        yield vehicle
+
+def csv_lines(rows: List[Dict[str, Any]], header: bool = False) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+    if header:
+        writer.writeheader()
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+def ndjson_lines(rows: List[Dict[str, Any]], header: bool = False) -> bytes:
+    return ''.join(json.dumps(row) + '\n' for row in rows).encode()
+
+# format -> (content type, encoder for a chunk of rows)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', csv_lines),
+    'ndjson': ('application/x-ndjson', ndjson_lines),
+}
+
+def parse_import(body: str, content_type: str) -> List[Any]:
+    """Rows of an import body: CSV, NDJSON, or a JSON array / {"vehicles": [...]}"""
+    if content_type == 'text/csv':
+        return list(csv.DictReader(io.StringIO(body)))
+    if content_type == 'application/x-ndjson':
+        rows = []
+        for line_no, line in enumerate(body.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except json.JSONDecodeError:
+                raise BadRequest(f'Invalid JSON on line {line_no}')
+        return rows
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError:
+        raise BadRequest('Invalid JSON body')
+    if isinstance(data, dict):
+        data = data.get('vehicles')
+    if not isinstance(data, list):
+        raise BadRequest('Expected a list of vehicles')
+    return data
+
+def clean_vehicle_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    """The vehicle fields present in a request body, cleaned up the same way /api/vehicles does"""
+    if 'userId' not in row and 'owner' in row:
+        row = dict(row, userId=row['owner'])
+    vehicle = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        if value is not None and value != '':
+            vehicle[field] = str(value).strip()
+    for field in ('make', 'model', 'color'):
+        if field in vehicle:
+            vehicle[field] = vehicle[field].title()
+    for field in ('state', 'plate'):
+        if field in vehicle:
+            vehicle[field] = vehicle[field].upper()
+    return vehicle
+
+def normalize_import(row: Any) -> Optional[Dict[str, Any]]:
+    """Clean up an imported row before validation"""
+    if not isinstance(row, dict):
+        return None
+    vehicle = clean_vehicle_fields(row)
+    vehicle.setdefault('registeredAt', datetime.utcnow().isoformat() + 'Z')
+    return vehicle
+
+# Routes
+@routes.get('/api/stats')
+@conditional('vehicles', 'economy', 'sessions', 'warnings', extra=stats_version)
+async def get_stats(request):
     """Get bot statistics from real data"""
     if web_manager:
-        return jsonify(web_manager.get_bot_stats())
-    return jsonify({'error': 'Bot not connected'}), 503
+        return web.json_response(web_manager.get_bot_stats())
+    return web.json_response({'error': 'Bot not connected'}, status=503)
 
-@app.route('/api/vehicles', methods=['GET'])
-def get_vehicles():
-    """Get all vehicles from real data"""
+@routes.get('/api/vehicles')
+@conditional('vehicles')
+async def get_vehicles(request):
+    """Get one page of vehicles.
+    
+    Query parameters: state, owner, make, q (search), sort, order,
+    limit and cursor (from the previous page's nextCursor).
+    """
     try:
         if not web_manager:
-            return jsonify({'error': 'Bot not connected'}), 503
-        
-        vehicles_data = web_manager.load_json_file("vehicles.json")
-        vehicles = vehicles_data.get('vehicles', [])
-        
-        # Add owner usernames if bot is available
-        if bot_instance:
-            guild = bot_instance.get_guild(GUILD_ID)
-            if guild:
-                for vehicle in vehicles:
-                    user_id = vehicle.get('userId')
-                    if user_id:
-                        try:
-                            member = guild.get_member(int(user_id))
-                            vehicle['ownerName'] = member.display_name if member else f"User#{user_id}"
-                            vehicle['ownerAvatar'] = str(member.avatar.url) if member and member.avatar else None
-                        except:
-                            vehicle['ownerName'] = f"User#{user_id}"
-                            vehicle['ownerAvatar'] = None
-        
-        return jsonify(vehicles)
+            return web.json_response({'error': 'Bot not connected'}, status=503)
+        
+        query = request.query
+        sort = query.get('sort', 'registeredAt')
+        if sort not in VEHICLE_SORT_FIELDS:
+            raise BadRequest(f"sort must be one of {', '.join(VEHICLE_SORT_FIELDS)}")
+        descending = sort_order(request)
+        limit = page_size(request)
+        cursor = decode_cursor(query.get('cursor'))
+        if cursor is not None and (len(cursor) != 3 or not all(isinstance(value, str) for value in cursor)):
+            raise BadRequest('Invalid cursor')
+        
+        def after_cursor(sort_key):
+            if cursor is None:
+                return True
+            return sort_key < cursor if descending else sort_key > cursor
+        
+        keyed = []
+        total = 0
+        for vehicle in filtered_vehicles(query):
+            total += 1
+            sort_key = vehicle_sort_key(vehicle, sort)
+            if after_cursor(sort_key):
+                keyed.append((sort_key, vehicle))
+        
+        # Only the page (plus one to detect a next page) is ordered, not every match
+        select = heapq.nlargest if descending else heapq.nsmallest
+        page = select(limit + 1, keyed, key=lambda item: item[0])
+        has_more = len(page) > limit
+        page = page[:limit]
+        
+        profiles = web_manager.member_profiles(vehicle.get('userId') for _, vehicle in page)
+        items = []
+        for _, vehicle in page:
+            vehicle = dict(vehicle)
+            user_id = vehicle.get('userId')
+            if user_id:
+                vehicle['ownerName'], vehicle['ownerAvatar'] = profiles[str(user_id)]
+            items.append(vehicle)
+        
+        return web.json_response({
+            'items': items,
+            'total': total,
+            'nextCursor': encode_cursor(page[-1][0]) if has_more else None
+        })
+    except BadRequest as e:
+        return web.json_response({'error': str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error getting vehicles: {e}")
-        return jsonify({'error': str(e)}), 500
+        return web.json_response({'error': str(e)}, status=500)
 
-@app.route('/api/vehicles', methods=['POST'])
-def add_vehicle():
+@routes.post('/api/vehicles')
+async def add_vehicle(request):
     """Add a new vehicle to real data"""
     try:
         if not web_manager:
-            return jsonify({'error': 'Bot not connected'}), 503
+            return web.json_response({'error': 'Bot not connected'}, status=503)
         
-        data = request.json
-        vehicles_data = web_manager.load_json_file("vehicles.json")
-        
-        if 'vehicles' not in vehicles_data:
-            vehicles_data['vehicles'] = []
+        data = await request.json()
         
         # Check for duplicate plate in same state
-        existing = any(
-            v['plate'].upper() == data['plate'].upper() and 
-            v['state'].upper() == data['state'].upper() 
-            for v in vehicles_data['vehicles']
-        )
-        
-        if existing:
-            return jsonify({'error': 'Vehicle with this plate already exists in this state'}), 400
+        if web_manager.store.exists("vehicles", (data['plate'].upper(), data['state'].upper())):
+            return web.json_response({'error': 'Vehicle with this plate already exists in this state'}, status=400)
         
         # Create new vehicle
         new_vehicle = {
@@ -214,81 +505,278 @@ def add_vehicle():
             'registeredAt': datetime.utcnow().isoformat() + 'Z'
         }
         
-        vehicles_data['vehicles'].append(new_vehicle)
+        try:
+            new_vehicle = web_manager.store.put("vehicles", new_vehicle)
+        except Exception:
+            return web.json_response({'error': 'Failed to save vehicle data'}, status=500)
         
-        if web_manager.save_json_file("vehicles.json", vehicles_data):
-            return jsonify({'success': True, 'vehicle': new_vehicle})
-        else:
-            return jsonify({'error': 'Failed to save vehicle data'}), 500
+        web_manager.bot.activity.record(
+            "vehicle.registered", f"Vehicle {new_vehicle['plate']} ({new_vehicle['state']}) registered from the dashboard",
+            target_id=new_vehicle['userId']
+        )
+        
+        return web.json_response({'success': True, 'vehicle': new_vehicle})
             
     except Exception as e:
         logger.error(f"Error adding vehicle: {e}")
-        return jsonify({'error': str(e)}), 500
+        return web.json_response({'error': str(e)}, status=500)
+
+@routes.get('/api/vehicles/export')
+async def export_vehicles(request):
+    """Stream vehicles as CSV or NDJSON (?format=), optionally with the /api/vehicles filters"""
+    if not web_manager:
+        return web.json_response({'error': 'Bot not connected'}, status=503)
+    
+    export_format = request.query.get('format', 'csv').lower()
+    if export_format not in EXPORT_FORMATS:
+        return web.json_response({'error': f"format must be one of {', '.join(EXPORT_FORMATS)}"}, status=400)
+    content_type, encode = EXPORT_FORMATS[export_format]
+    
+    response = web.StreamResponse(headers={
+        'Content-Type': content_type,
+        'Content-Disposition': f'attachment; filename="vehicles.{export_format}"',
+        'Access-Control-Allow-Origin': '*'
+    })
+    response.enable_compression()
+    await response.prepare(request)
+    
+    # Rows are serialized a chunk at a time, so memory stays flat however
+    # many vehicles there are and the loop gets a turn between chunks
+    vehicles = filtered_vehicles(request.query)
+    first = True
+    try:
+        while True:
+            chunk = [vehicle for _, vehicle in zip(range(EXPORT_CHUNK_SIZE), vehicles)]
+            if not chunk and not first:
+                break
+            profiles = web_manager.member_profiles(vehicle.get('userId') for vehicle in chunk)
+            rows = []
+            for vehicle in chunk:
+                row = dict(vehicle)
+                user_id = vehicle.get('userId')
+                if user_id:
+                    row['ownerName'] = profiles[str(user_id)][0]
+                rows.append(row)
+            await response.write(encode(rows, header=first))
+            first = False
+    except ConnectionResetError:
+        pass
+    return response
 
-@app.route('/api/vehicles/<int:vehicle_index>', methods=['DELETE'])
-def delete_vehicle(vehicle_index):
-    """Delete a vehicle from real data"""
+@routes.post('/api/vehicles/import')
+async def import_vehicles(request):
+    """Validate, dedup and store a batch of vehicles with a single write.
+    
+    The body is a JSON array (or {"vehicles": [...]}), NDJSON or CSV with
+    the export's columns. Rows are checked with the same rules as
+    repair_vehicles_json.py; a plate already registered in its state is
+    skipped unless ?replace=true.
+    """
     try:
         if not web_manager:
-            return jsonify({'error': 'Bot not connected'}), 503
+            return web.json_response({'error': 'Bot not connected'}, status=503)
         
-        vehicles_data = web_manager.load_json_file("vehicles.json")
-        vehicles = vehicles_data.get('vehicles', [])
+        rows = parse_import(await request.text(), request.content_type)
+        replace = request.query.get('replace', '').lower() in ('1', 'true', 'yes')
+        store = web_manager.store
         
-        if 0 <= vehicle_index < len(vehicles):
-            deleted_vehicle = vehicles.pop(vehicle_index)
-            
-            if web_manager.save_json_file("vehicles.json", vehicles_data):
-                return jsonify({'success': True, 'deleted': deleted_vehicle})
-            else:
-                return jsonify({'error': 'Failed to save changes'}), 500
-        else:
-            return jsonify({'error': 'Vehicle not found'}), 404
-            
+        accepted = {}
+        invalid_rows = []
+        duplicates = 0
+        for row_no, row in enumerate(rows, 1):
+            vehicle = normalize_import(row)
+            error = 'Not an object' if vehicle is None else vehicle_error(vehicle)
+            if error:
+                # Reported in the response only; a bad file shouldn't flood the log
+                invalid_rows.append({'row': row_no, 'error': error})
+                continue
+            key = store.key_for("vehicles", vehicle)
+            if key in accepted or (not replace and store.exists("vehicles", key)):
+                duplicates += 1
+                continue
+            accepted[key] = vehicle
+        
+        try:
+            imported = store.put_many("vehicles", accepted.values())
+        except Exception:
+            return web.json_response({'error': 'Failed to save vehicle data'}, status=500)
+        
+        if imported:
+            web_manager.bot.activity.record(
+                "vehicle.imported", f"{imported} vehicles imported from the dashboard", count=imported
+            )
+        
+        return web.json_response({
+            'success': True,
+            'imported': imported,
+            'duplicates': duplicates,
+            'invalid': len(invalid_rows),
+            'invalidRows': invalid_rows[:IMPORT_REPORTED_ROWS]
+        })
+    except BadRequest as e:
+        return web.json_response({'error': str(e)}, status=400)
     except Exception as e:
-        logger.error(f"Error deleting vehicle: {e}")
-        return jsonify({'error': str(e)}), 500
+        logger.error(f"Error importing vehicles: {e}")
+        return web.json_response({'error': str(e)}, status=500)
+
+def delete_vehicle_at(key) -> web.Response:
+    deleted_vehicle = web_manager.store.delete("vehicles", key)
+    if deleted_vehicle is None:
+        return web.json_response({'error': 'Vehicle not found'}, status=404)
+    web_manager.bot.activity.record(
+        "vehicle.deleted", f"Vehicle {deleted_vehicle['plate']} ({deleted_vehicle['state']}) deleted from the dashboard",
+        target_id=deleted_vehicle.get('userId')
+    )
+    return web.json_response({'success': True, 'deleted': deleted_vehicle})
 
-@app.route('/api/economy', methods=['GET'])
-def get_economy():
-    """Get economy data from real data"""
+@routes.get('/api/vehicles/{vehicle_id:[0-9a-f]{32}}')
+async def get_vehicle(request):
+    """Get one vehicle by its id"""
+    if not web_manager:
+        return web.json_response({'error': 'Bot not connected'}, status=503)
+    
+    store = web_manager.store
+    key = store.key_by("vehicles", "id", request.match_info['vehicle_id'])
+    vehicle = store.get("vehicles", key) if key is not None else None
+    if vehicle is None:
+        return web.json_response({'error': 'Vehicle not found'}, status=404)
+    return web.json_response(vehicle)
+
+@routes.patch('/api/vehicles/{vehicle_id:[0-9a-f]{32}}')
+async def update_vehicle(request):
+    """Update a vehicle's owner, make, model, color, state or plate by its id"""
     try:
         if not web_manager:
-            return jsonify({'error': 'Bot not connected'}), 503
+            return web.json_response({'error': 'Bot not connected'}, status=503)
         
-        economy_data = web_manager.load_json_file("economy.json")
-        users_data = economy_data.get('users', {})
+        data = await request.json()
+        if not isinstance(data, dict):
+            raise BadRequest('Expected a JSON object')
+        changes = clean_vehicle_fields(data)
+        changes.pop('registeredAt', None)
         
-        users = []
-        total_money = 0
+        store = web_manager.store
+        vehicle_id = request.match_info['vehicle_id']
+        key = store.key_by("vehicles", "id", vehicle_id)
+        if key is None:
+            return web.json_response({'error': 'Vehicle not found'}, status=404)
         
-        for user_id, user_data in users_data.items():
-            balance = user_data.get('balance', 0)
-            bank = user_data.get('bank', 0)
-            total_wealth = balance + bank
-            total_money += total_wealth
+        new_key = (changes.get('plate', key[0]), changes.get('state', key[1]))
+        
+        async with store.locked("vehicles", key, new_key):
+            # The vehicle may have been re-plated or removed while waiting for the lock
+            if store.key_by("vehicles", "id", vehicle_id) != key:
+                return web.json_response({'error': 'Vehicle was modified, please retry'}, status=409)
+            updated = dict(store.get("vehicles", key), **changes)
+            error = vehicle_error(updated)
+            if error:
+                raise BadRequest(error)
+            if new_key != key and store.exists("vehicles", new_key):
+                return web.json_response({'error': 'Vehicle with this plate already exists in this state'}, status=409)
+            try:
+                vehicle = store.replace("vehicles", key, updated)
+            except Exception:
+                return web.json_response({'error': 'Failed to save vehicle data'}, status=500)
+        
+        web_manager.bot.activity.record(
+            "vehicle.updated", f"Vehicle {vehicle['plate']} ({vehicle['state']}) updated from the dashboard",
+            target_id=vehicle.get('userId')
+        )
+        return web.json_response({'success': True, 'vehicle': vehicle})
             
-            # Get username if bot is available
-            username = f"User#{user_id}"
-            avatar = None
+    except BadRequest as e:
+        return web.json_response({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error updating vehicle: {e}")
+        return web.json_response({'error': str(e)}, status=500)
+
+@routes.delete('/api/vehicles/{vehicle_id:[0-9a-f]{32}}')
+async def delete_vehicle(request):
+    """Delete a vehicle by its id"""
+    try:
+        if not web_manager:
+            return web.json_response({'error': 'Bot not connected'}, status=503)
+        
+        key = web_manager.store.key_by("vehicles", "id", request.match_info['vehicle_id'])
+        if key is None:
+            return web.json_response({'error': 'Vehicle not found'}, status=404)
+        return delete_vehicle_at(key)
             
-            if bot_instance:
-                guild = bot_instance.get_guild(GUILD_ID)
-                if guild:
-                    try:
-                        member = guild.get_member(int(user_id))
-                        if member:
-                            username = member.display_name
-                            avatar = str(member.avatar.url) if member.avatar else None
-                    except:
-                        pass
+    except Exception as e:
+        logger.error(f"Error deleting vehicle: {e}")
+        return web.json_response({'error': str(e)}, status=500)
+
+@routes.delete('/api/vehicles/{state}/{plate}')
+async def delete_vehicle_by_plate(request):
+    """Delete a vehicle by its state and plate"""
+    try:
+        if not web_manager:
+            return web.json_response({'error': 'Bot not connected'}, status=503)
+        
+        return delete_vehicle_at((request.match_info['plate'].upper(), request.match_info['state'].upper()))
             
+    except Exception as e:
+        logger.error(f"Error deleting vehicle: {e}")
+        return web.json_response({'error': str(e)}, status=500)
+
+@routes.get('/api/economy')
+@conditional('economy')
+async def get_economy(request):
+    """Get one page of economy accounts ranked by total wealth.
+    
+    Query parameters: min_wealth, order (desc = richest first, the
+    default), limit and cursor (from the previous page's nextCursor).
+    """
+    try:
+        if not web_manager:
+            return web.json_response({'error': 'Bot not connected'}, status=503)
+        
+        query = request.query
+        leaderboard = web_manager.bot.leaderboard
+        try:
+            min_wealth = int(query['min_wealth']) if query.get('min_wealth') else None
+        except ValueError:
+            raise BadRequest('min_wealth must be an integer')
+        descending = sort_order(request, default='desc')
+        limit = page_size(request)
+        cursor = decode_cursor(query.get('cursor'))
+        if cursor is not None and (len(cursor) != 2 or not isinstance(cursor[0], int)):
+            raise BadRequest('Invalid cursor')
+        
+        # Walk the maintained ranking from the cursor instead of sorting every account
+        if descending:
+            start = leaderboard.position_after(*cursor) if cursor else 0
+            end = leaderboard.count_at_least(min_wealth) if min_wealth is not None else len(leaderboard)
+            entries = leaderboard.ranked(start) if start < end else iter(())
+        else:
+            start = leaderboard.position(*cursor) - 1 if cursor else len(leaderboard) - 1
+            if min_wealth is not None:
+                start = min(start, leaderboard.count_at_least(min_wealth) - 1)
+            end = None
+            entries = leaderboard.ranked(start, reverse=True) if start >= 0 else iter(())
+        
+        page = []
+        has_more = False
+        for position, (user_id, total_wealth) in enumerate(entries, start if descending else 0):
+            if end is not None and position >= end:
+                break  # Everyone after this is below min_wealth
+            if len(page) == limit:
+                has_more = True
+                break
+            page.append((user_id, total_wealth))
+        
+        richest = leaderboard.top(1)
+        profiles = web_manager.member_profiles([user_id for user_id, _ in page + richest])
+        users = []
+        for user_id, total_wealth in page:
+            user_data = web_manager.store.get("economy", user_id) or {}
+            username, avatar = profiles[user_id]
             users.append({
                 'id': user_id,
                 'username': username,
                 'avatar': avatar,
-                'balance': balance,
-                'bank': bank,
+                'balance': user_data.get('balance', 0),
+                'bank': user_data.get('bank', 0),
                 'total': total_wealth,
                 'totalEarned': user_data.get('total_earned', 0),
                 'totalSpent': user_data.get('total_spent', 0),
@@ -297,92 +785,77 @@ def get_economy():
                 'lastWork': user_data.get('last_work')
             })
         
-        # Sort by total wealth
-        users.sort(key=lambda x: x['total'], reverse=True)
-        
-        return jsonify({
+        total_money = leaderboard.total_money
+        return web.json_response({
             'users': users,
+            'nextCursor': encode_cursor([page[-1][1], page[-1][0]]) if has_more else None,
+            'totalUsers': len(leaderboard),
             'totalMoney': total_money,
-            'averageWealth': total_money / len(users) if users else 0,
-            'richestUser': users[0]['username'] if users else 'None'
+            'averageWealth': total_money / len(leaderboard) if len(leaderboard) else 0,
+            'richestUser': profiles[richest[0][0]][0] if richest else 'None'
         })
         
+    except BadRequest as e:
+        return web.json_response({'error': str(e)}, status=400)
     except Exception as e:
         logger.error(f"Error getting economy data: {e}")
-        return jsonify({'error': str(e)}), 500
+        return web.json_response({'error': str(e)}, status=500)
 
-@app.route('/api/sessions', methods=['GET'])
-def get_sessions():
+@routes.get('/api/sessions')
+@conditional('sessions')
+async def get_sessions(request):
     """Get sessions from real data"""
     try:
         if not web_manager:
-            return jsonify({'error': 'Bot not connected'}), 503
-        
-        sessions_data = web_manager.load_json_file("sessions.json")
-        sessions = sessions_data.get('sessions', [])
-        
-        # Add host usernames if bot is available
-        if bot_instance:
-            guild = bot_instance.get_guild(GUILD_ID)
-            if guild:
-                for session in sessions:
-                    host_id = session.get('host_id')
-                    if host_id:
-                        try:
-                            member = guild.get_member(int(host_id))
-                            session['hostName'] = member.display_name if member else f"User#{host_id}"
-                            session['hostAvatar'] = str(member.avatar.url) if member and member.avatar else None
-                        except:
-                            session['hostName'] = f"User#{host_id}"
-                            session['hostAvatar'] = None
-                    
-                    cohost_id = session.get('cohost_id')
-                    if cohost_id:
-                        try:
-                            member = guild.get_member(int(cohost_id))
-                            session['cohostName'] = member.display_name if member else f"User#{cohost_id}"
-                        except:
-                            session['cohostName'] = f"User#{cohost_id}"
-        
-        return jsonify(sessions)
+            return web.json_response({'error': 'Bot not connected'}, status=503)
+        
+        sessions = [dict(s) for s in web_manager.store.all("sessions")]
+        
+        # Add host usernames
+        profiles = web_manager.member_profiles(
+            [session.get('host_id') for session in sessions] + [session.get('cohost_id') for session in sessions]
+        )
+        for session in sessions:
+            host_id = session.get('host_id')
+            if host_id:
+                session['hostName'], session['hostAvatar'] = profiles[str(host_id)]
+            
+            cohost_id = session.get('cohost_id')
+            if cohost_id:
+                session['cohostName'] = profiles[str(cohost_id)][0]
+        
+        return web.json_response(sessions)
         
     except Exception as e:
         logger.error(f"Error getting sessions: {e}")
-        return jsonify({'error': str(e)}), 500
+        return web.json_response({'error': str(e)}, status=500)
 
-@app.route('/api/moderation', methods=['GET'])
-def get_moderation():
-    """Get moderation data from real data"""
+@routes.get('/api/moderation')
+@conditional('warnings', 'timeouts')
+async def get_moderation(request):
+    """Get moderation data from real data (?user= limits the warnings to one user's history)"""
     try:
         if not web_manager:
-            return jsonify({'error': 'Bot not connected'}), 503
+            return web.json_response({'error': 'Bot not connected'}, status=503)
         
-        warnings_data = web_manager.load_json_file("warnings.json")
-        warnings = warnings_data.get('data', [])
+        store = web_manager.store
+        user_filter = request.query.get('user')
+        if user_filter:
+            warnings = store.find("warnings", "user", user_filter)
+        else:
+            warnings = store.all("warnings")
         
         # Process warnings data
+        recent = warnings[-50:]  # Last 50 warnings
+        users = web_manager.member_profiles(warning.get('user_id') for warning in recent)
+        moderators = web_manager.member_profiles((warning.get('moderator_id') for warning in recent), placeholder="Mod")
         processed_warnings = []
-        for warning in warnings[-50:]:  # Last 50 warnings
+        for warning in recent:
             user_id = warning.get('user_id')
             mod_id = warning.get('moderator_id')
             
-            user_name = f"User#{user_id}"
-            mod_name = f"Mod#{mod_id}"
-            user_avatar = None
-            
-            if bot_instance:
-                guild = bot_instance.get_guild(GUILD_ID)
-                if guild:
-                    try:
-                        user = guild.get_member(int(user_id))
-                        moderator = guild.get_member(int(mod_id))
-                        if user:
-                            user_name = user.display_name
-                            user_avatar = str(user.avatar.url) if user.avatar else None
-                        if moderator:
-                            mod_name = moderator.display_name
-                    except:
-                        pass
+            user_name, user_avatar = users.get(str(user_id), (f"User#{user_id}", None))
+            mod_name = moderators.get(str(mod_id), (f"Mod#{mod_id}", None))[0]
             
             processed_warnings.append({
                 'id': warning.get('id'),
@@ -396,27 +869,28 @@ def get_moderation():
                 'status': 'Active'
             })
         
-        return jsonify({
+        return web.json_response({
             'warnings': processed_warnings,
-            'totalWarnings': len(warnings),
-            'activeTimeouts': 0,  # Would need separate tracking
+            'totalWarnings': store.count("warnings"),
+            'userWarnings': len(warnings) if user_filter else None,
+            'activeTimeouts': len(web_manager.bot.timeouts),
             'recentBans': 0       # Would need separate tracking
         })
         
     except Exception as e:
         logger.error(f"Error getting moderation data: {e}")
-        return jsonify({'error': str(e)}), 500
+        return web.json_response({'error': str(e)}, status=500)
 
-@app.route('/api/users', methods=['GET'])
-def get_users():
+@routes.get('/api/users')
+async def get_users(request):
     """Get guild users"""
     try:
         if not bot_instance:
-            return jsonify({'error': 'Bot not connected'}), 503
+            return web.json_response({'error': 'Bot not connected'}, status=503)
         
         guild = bot_instance.get_guild(GUILD_ID)
         if not guild:
-            return jsonify({'error': 'Guild not found'}), 404
+            return web.json_response({'error': 'Guild not found'}, status=404)
         
         users = []
         for member in guild.members[:100]:  # Limit to first 100 members
@@ -436,127 +910,259 @@ def get_users():
                 }
             })
         
-        return jsonify(users)
+        return web.json_response(users)
         
     except Exception as e:
         logger.error(f"Error getting users: {e}")
-        return jsonify({'error': str(e)}), 500
+        return web.json_response({'error': str(e)}, status=500)
 
-@app.route('/api/economy/action', methods=['POST'])
-def economy_action():
+@routes.post('/api/economy/action')
+async def economy_action(request):
     """Perform economy action on real data"""
     try:
         if not web_manager:
-            return jsonify({'error': 'Bot not connected'}), 503
+            return web.json_response({'error': 'Bot not connected'}, status=503)
         
-        data = request.json
+        data = await request.json()
         user_id = data['user']
         action = data['action']
         amount = int(data['amount'])
         target = data['target']  # 'balance' or 'bank'
         
-        economy_data = web_manager.load_json_file("economy.json")
-        
-        if 'users' not in economy_data:
-            economy_data['users'] = {}
-        
-        if user_id not in economy_data['users']:
-            economy_data['users'][user_id] = {
-                'balance': 0,
-                'bank': 0,
-                'total_earned': 0,
-                'total_spent': 0
-            }
+        if target not in ('balance', 'bank'):
+            return web.json_response({'error': 'Invalid target'}, status=400)
         
-        user_data = economy_data['users'][user_id]
+        try:
+            await web_manager.apply_economy_action(user_id, action, amount, target)
+        except Exception:
+            return web.json_response({'error': 'Failed to save changes'}, status=500)
         
-        if action == 'add':
-            user_data[target] += amount
-            user_data['total_earned'] += amount
-        elif action == 'remove':
-            user_data[target] = max(0, user_data[target] - amount)
-            user_data['total_spent'] += amount
-        elif action == 'set':
-            user_data[target] = amount
+        web_manager.bot.activity.record(
+            "economy.action", f"Dashboard {action} ${amount:,} ({target}) for User#{user_id}",
+            target_id=user_id, action=action, amount=amount, target=target, reason=data.get('reason')
+        )
         
-        if web_manager.save_json_file("economy.json", economy_data):
-            return jsonify({'success': True})
-        else:
-            return jsonify({'error': 'Failed to save changes'}), 500
+        return web.json_response({'success': True})
             
     except Exception as e:
         logger.error(f"Error performing economy action: {e}")
-        return jsonify({'error': str(e)}), 500
+        return web.json_response({'error': str(e)}, status=500)
+
+def time_ago(timestamp: float) -> str:
+    delta = timedelta(seconds=max(0, time.time() - timestamp))
+    if delta.days > 0:
+        return f"{delta.days}d {delta.seconds//3600}h ago"
+    if delta.seconds >= 3600:
+        return f"{delta.seconds//3600}h {(delta.seconds//60) % 60}m ago"
+    return f"{delta.seconds//60}m ago"
+
+def activity_version():
+    latest = web_manager.bot.activity.query(limit=1)
+    return minute_bucket(), latest[0]['ts'] if latest else None
 
-@app.route('/api/recent-activity')
-def get_recent_activity():
-    """Get recent activity from real data"""
+@routes.get('/api/recent-activity')
+@conditional(extra=activity_version)
+async def get_recent_activity(request):
+    """Most recent entries of the activity log, newest first.
+    
+    Query parameters: limit (default 10), since / until (unix seconds)
+    and kind (repeatable, e.g. kind=moderation.ban).
+    """
     try:
         if not web_manager:
-            return jsonify([])
+            return web.json_response([])
         
-        activities = []
+        query = request.query
+        try:
+            limit = max(1, min(int(query.get('limit', 10)), MAX_PAGE_SIZE))
+            since = float(query['since']) if query.get('since') else None
+            until = float(query['until']) if query.get('until') else None
+        except ValueError:
+            raise BadRequest('limit, since and until must be numbers')
         
-        # Recent vehicles
-        vehicles_data = web_manager.load_json_file("vehicles.json")
-        for vehicle in vehicles_data.get('vehicles', [])[-5:]:
-            try:
-                reg_time = datetime.fromisoformat(vehicle['registeredAt'].replace('Z', '+00:00'))
-                time_ago = datetime.utcnow() - reg_time.replace(tzinfo=None)
-                if time_ago.days < 7:
-                    activities.append({
-                        'icon': 'fas fa-car',
-                        'text': f"Vehicle {vehicle['plate']} registered",
-                        'time': f"{time_ago.days}d {time_ago.seconds//3600}h ago" if time_ago.days > 0 else f"{time_ago.seconds//60}m ago"
-                    })
-            except:
-                continue
+        entries = web_manager.bot.activity.query(limit=limit, since=since, until=until, kinds=query.getall('kind', None))
+        return web.json_response([
+            {
+                'icon': entry['icon'],
+                'text': entry['text'],
+                'kind': entry['kind'],
+                'timestamp': entry['timestamp'],
+                'time': time_ago(entry['ts'])
+            }
+            for entry in entries
+        ])
         
-        # Recent sessions
-        sessions_data = web_manager.load_json_file("sessions.json")
-        for session in sessions_data.get('sessions', [])[-3:]:
+    except BadRequest as e:
+        return web.json_response({'error': str(e)}, status=400)
+    except Exception as e:
+        logger.error(f"Error getting recent activity: {e}")
+        return web.json_response([])
+
+@routes.get('/api/events')
+async def event_stream(request):
+    """Stream live change events to the dashboard (Server-Sent Events)"""
+    if not web_manager:
+        return web.json_response({'error': 'Bot not connected'}, status=503)
+    
+    response = web.StreamResponse(headers={
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+        'Access-Control-Allow-Origin': '*'
+    })
+    await response.prepare(request)
+    
+    events = web_manager.bot.events
+    queue = events.subscribe()
+    try:
+        await response.write(b"retry: 5000\n\n")
+        while True:
             try:
-                created_time = datetime.fromisoformat(session['created_at'])
-                time_ago = datetime.utcnow() - created_time
-                if time_ago.days < 7:
-                    activities.append({
-                        'icon': 'fas fa-gamepad',
-                        'text': f"Session #{session['id']} created",
-                        'time': f"{time_ago.days}d {time_ago.seconds//3600}h ago" if time_ago.days > 0 else f"{time_ago.seconds//60}m ago"
-                    })
-            except:
+                event = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle connection
+                await response.write(b": keep-alive\n\n")
                 continue
-        
-        # Recent warnings
-        warnings_data = web_manager.load_json_file("warnings.json")
-        for warning in warnings_data.get('data', [])[-3:]:
-            try:
-                warn_time = datetime.fromisoformat(warning['timestamp'])
-                time_ago = datetime.utcnow() - warn_time
-                if time_ago.days < 7:
-                    activities.append({
-                        'icon': 'fas fa-exclamation-triangle',
-                        'text': f"Warning issued to user",
-                        'time': f"{time_ago.days}d {time_ago.seconds//3600}h ago" if time_ago.days > 0 else f"{time_ago.seconds//60}m ago"
-                    })
-            except:
+            await response.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+    except ConnectionResetError:
+        pass
+    finally:
+        events.unsubscribe(queue)
+    return response
+
+class StaticAssets:
+    """The web/ files, loaded once with a content fingerprint and precompressed variants.
+    
+    index.html is rewritten to reference ``name.<hash>.ext`` URLs for the
+    other assets, which can then be cached by browsers indefinitely; the
+    page itself and the plain file names are always revalidated by ETag.
+    """
+    
+    CONTENT_TYPES = {
+        '.html': 'text/html',
+        '.css': 'text/css',
+        '.js': 'application/javascript',
+        '.json': 'application/json',
+        '.svg': 'image/svg+xml',
+        '.png': 'image/png',
+        '.ico': 'image/x-icon',
+        '.webp': 'image/webp',
+    }
+    TEXT_TYPES = ('.html', '.css', '.js', '.json', '.svg')
+    
+    def __init__(self, root: Path = WEB_DIR):
+        self.root = root
+        # url name -> (EncodedBody, content type, etag, immutable, compressible)
+        self._files: Dict[str, tuple] = {}
+        self.load()
+    
+    def load(self):
+        files = {}
+        fingerprints = {}
+        for path in sorted(self.root.rglob('*')):
+            if not path.is_file() or path.suffix not in self.CONTENT_TYPES:
                 continue
+            name = path.relative_to(self.root).as_posix()
+            files[name] = path.read_bytes()
+            fingerprints[name] = hashlib.sha256(files[name]).hexdigest()[:10]
         
-        # Sort by most recent and limit
-        return jsonify(activities[-10:])
+        if 'index.html' in files:
+            html = files['index.html'].decode('utf-8')
+            for name, digest in fingerprints.items():
+                if name != 'index.html':
+                    stem, _, suffix = name.rpartition('.')
+                    html = re.sub(rf'((?:src|href)=")({re.escape(name)})(")', rf'\g<1>{stem}.{digest}.{suffix}\g<3>', html)
+            files['index.html'] = html.encode('utf-8')
+            fingerprints['index.html'] = hashlib.sha256(files['index.html']).hexdigest()[:10]
         
-    except Exception as e:
-        logger.error(f"Error getting recent activity: {e}")
-        return jsonify([])
+        self._files = {}
+        for name, data in files.items():
+            suffix = Path(name).suffix
+            body = EncodedBody(data)
+            etag = f'"{fingerprints[name]}"'
+            compressible = suffix in self.TEXT_TYPES
+            stem, _, ext = name.rpartition('.')
+            self._files[name] = (body, self.CONTENT_TYPES[suffix], etag, False, compressible)
+            self._files[f"{stem}.{fingerprints[name]}.{ext}"] = (body, self.CONTENT_TYPES[suffix], etag, True, compressible)
+        logger.info(f"Loaded {len(files)} static assets")
+    
+    def response(self, request, name: str) -> web.Response:
+        asset = self._files.get(name)
+        if asset is None:
+            raise web.HTTPNotFound()
+        body, content_type, etag, immutable, compressible = asset
+        headers = {
+            'Cache-Control': f'public, max-age={STATIC_MAX_AGE}, immutable' if immutable else 'no-cache'
+        }
+        response = encoded_response(request, body, content_type, etag, headers, compressible)
+        if compressible and response.status == 200:
+            response.charset = 'utf-8'
+        return response
+
+static_assets = None
+
+# Static files are registered after the API so they never shadow /api/*
+async def index(request):
+    """Serve the main web interface"""
+    return static_assets.response(request, 'index.html')
+
+async def serve_static(request):
+    """Serve static files"""
+    return static_assets.response(request, request.match_info['filename'])
+
+@web.middleware
+async def compression_middleware(request, handler):
+    """Compress JSON responses that weren't already encoded (e.g. uncached routes)"""
+    response = await handler(request)
+    if (
+        type(response) is web.Response
+        and response.status == 200
+        and 'Content-Encoding' not in response.headers
+        and response.content_type == 'application/json'
+        and isinstance(response.body, bytes)
+        and len(response.body) >= COMPRESS_MIN_SIZE
+    ):
+        encoding = accepted_encoding(request)
+        if encoding:
+            response.body = EncodedBody(response.body).get(encoding)
+            response.headers['Content-Encoding'] = encoding
+            response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+@web.middleware
+async def cors_middleware(request, handler):
+    """Allow the dashboard to be opened from any origin"""
+    if request.method == 'OPTIONS':
+        response = web.Response()
+        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, PATCH, DELETE, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = request.headers.get('Access-Control-Request-Headers', '*')
+    else:
+        response = await handler(request)
+    if not response.prepared:  # Streaming responses set their own headers
+        response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+def create_app() -> web.Application:
+    global static_assets
+    static_assets = StaticAssets()
+    app = web.Application(middlewares=[cors_middleware, compression_middleware], client_max_size=IMPORT_MAX_BYTES)
+    app.add_routes(routes)
+    app.router.add_get('/', index)
+    app.router.add_get('/{filename:.+}', serve_static)
+    return app
 
-def start_web_server(bot, host='0.0.0.0', port=5000):
-    """Start the web server"""
+async def start_web_server(bot, host='0.0.0.0', port=5000) -> web.AppRunner:
+    """Start the web server on the bot's event loop and return its runner"""
     global web_manager
     web_manager = WebManager(bot)
     
-    logger.info(f"Starting web server on {host}:{port}")
-    app.run(host=host, port=port, debug=False)
+    runner = web.AppRunner(create_app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    logger.info(f"Web server listening on {host}:{port}")
+    return runner
 
 if __name__ == '__main__':
     # For testing without bot
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    web.run_app(create_app(), host='0.0.0.0', port=5000)